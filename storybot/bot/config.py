@@ -6,6 +6,45 @@ class Settings(BaseSettings):
     mongo_dsn: str       = Field(..., env='MONGO_DSN')
     log_level: str       = Field('INFO', env='LOG_LEVEL')
 
+    browser_pool_size: int      = Field(3, env='BROWSER_POOL_SIZE')
+    browser_max_pages: int      = Field(50, env='BROWSER_MAX_PAGES')
+    warmup_strategy: str        = Field('auto', env='WARMUP_STRATEGY')  # auto | http | chrome
+    browser_queue_limit: int    = Field(20, env='BROWSER_QUEUE_LIMIT')   # lookups waiting for Chrome
+    browser_deadline: float     = Field(45, env='BROWSER_DEADLINE')      # seconds per Chrome call
+
+    story_cache_ttl: int        = Field(600, env='STORY_CACHE_TTL')      # seconds
+    story_cache_size: int       = Field(1024, env='STORY_CACHE_SIZE')    # usernames
+    story_cache_mongo: bool     = Field(False, env='STORY_CACHE_MONGO')
+
+    story_delivery: str         = Field('album', env='STORY_DELIVERY')   # album | single
+
+    tg_global_rate: float       = Field(30, env='TG_GLOBAL_RATE')        # msg/s, all chats
+    tg_chat_rate: float         = Field(1, env='TG_CHAT_RATE')           # msg/s, one chat
+    tg_send_workers: int        = Field(16, env='TG_SEND_WORKERS')
+    tg_replicas: int            = Field(1, env='TG_REPLICAS')            # processes sharing the global rate
+
+    scheduler_mode: str         = Field('user', env='SCHEDULER_MODE')    # user | target
+    job_max_running: int        = Field(20, env='JOB_MAX_RUNNING')       # concurrent auto-checks
+    run_scheduler: bool         = Field(True, env='RUN_SCHEDULER')       # on exactly one replica
+
+    settings_cache_size: int    = Field(10_000, env='SETTINGS_CACHE_SIZE')
+    settings_cache_ttl: int     = Field(300, env='SETTINGS_CACHE_TTL')   # seconds, bounds staleness
+    settings_cache_watch: bool  = Field(False, env='SETTINGS_CACHE_WATCH')  # needs a replica set
+
+    tg_mode: str                = Field('polling', env='TG_MODE')        # polling | webhook
+    update_concurrency: int     = Field(100, env='UPDATE_CONCURRENCY')   # updates handled at once
+    webhook_url: str            = Field('', env='WEBHOOK_URL')           # public base URL
+    webhook_path: str           = Field('/webhook', env='WEBHOOK_PATH')
+    webhook_secret: str         = Field('', env='WEBHOOK_SECRET')
+    webhook_host: str           = Field('0.0.0.0', env='WEBHOOK_HOST')
+    webhook_port: int           = Field(8080, env='WEBHOOK_PORT')
+
+    health_port: int            = Field(8000, env='HEALTH_PORT')
+
+    relay_dir: str              = Field('', env='RELAY_DIR')             # default: $TMPDIR/storybot-relay
+    relay_max_bytes: int        = Field(50 * 1024 * 1024, env='RELAY_MAX_BYTES')  # bot upload limit
+    relay_concurrency: int      = Field(4, env='RELAY_CONCURRENCY')
+
     class Config:
         env_file = '.env'
 
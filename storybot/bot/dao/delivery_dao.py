@@ -0,0 +1,68 @@
+"""
+storybot.bot.dao.delivery_dao
+─────────────────────────────
+Remembers which stories were already pushed to a user for a given target,
+so auto-checks only deliver new ones.  Entries expire with the story.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Set
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError
+
+from ..services.metrics import span
+from .settings_dao import _get_client
+
+log = logging.getLogger(__name__)
+
+STORY_LIFETIME = timedelta(hours=24)
+
+
+def _get_collection() -> AsyncIOMotorCollection:
+    """Lazy access to the deliveries collection."""
+    return _get_client().get_default_database().deliveries
+
+
+def _key(user_id: int, target: str, fingerprint: str) -> str:
+    return f"{user_id}:{target}:{fingerprint}"
+
+
+class DeliveryDAO:
+    """Per (user, target) set of delivered story fingerprints."""
+
+    @classmethod
+    async def delivered(
+        cls, user_id: int, target: str, fingerprints: Iterable[str]
+    ) -> Set[str]:
+        """Subset of *fingerprints* already sent to *user_id* for *target*."""
+        keys = {_key(user_id, target, fp): fp for fp in fingerprints}
+        if not keys:
+            return set()
+        cursor = _get_collection().find(
+            {"_id": {"$in": list(keys)}, "expires_at": {"$gt": datetime.utcnow()}},
+            {"_id": 1},
+        )
+        with span("mongo.deliveries.find"):
+            return {keys[doc["_id"]] async for doc in cursor}
+
+    @classmethod
+    async def mark(cls, user_id: int, target: str, fingerprints: Iterable[str]) -> None:
+        expires = datetime.utcnow() + STORY_LIFETIME
+        docs = [
+            {"_id": _key(user_id, target, fp), "expires_at": expires}
+            for fp in fingerprints
+        ]
+        if not docs:
+            return
+        try:
+            with span("mongo.deliveries.insert"):
+                await _get_collection().insert_many(docs, ordered=False)
+        except BulkWriteError as exc:
+            # duplicates are expected when a story is re-marked
+            dupes = [e for e in exc.details.get("writeErrors", []) if e.get("code") != 11000]
+            if dupes:
+                log.warning("deliveries insert failed: %s", dupes[:3])
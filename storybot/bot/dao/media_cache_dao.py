@@ -0,0 +1,60 @@
+"""
+storybot.bot.dao.media_cache_dao
+────────────────────────────────
+Maps story media (by URL fingerprint) to the Telegram ``file_id`` returned
+on first upload, so later sends to any user reuse it instead of making
+Telegram download the CDN URL again.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from ..services.metrics import span
+from .settings_dao import _get_client
+
+log = logging.getLogger(__name__)
+
+MEDIA_TTL = timedelta(hours=24)   # a story never outlives this
+
+
+def _get_collection() -> AsyncIOMotorCollection:
+    """Lazy access to the media_cache collection."""
+    return _get_client().get_default_database().media_cache
+
+
+class MediaCacheDAO:
+    """fingerprint → file_id with TTL expiry."""
+
+    @classmethod
+    async def get_many(cls, fingerprints: Iterable[str]) -> Dict[str, str]:
+        fps = list(fingerprints)
+        if not fps:
+            return {}
+        with span("mongo.media_cache.get"):
+            cursor = _get_collection().find(
+                {"_id": {"$in": fps}, "expires_at": {"$gt": datetime.utcnow()}},
+                {"file_id": 1},
+            )
+            return {doc["_id"]: doc["file_id"] async for doc in cursor}
+
+    @classmethod
+    async def put_many(cls, file_ids: Dict[str, str]) -> None:
+        if not file_ids:
+            return
+        expires = datetime.utcnow() + MEDIA_TTL
+        ops = [
+            UpdateOne(
+                {"_id": fp},
+                {"$set": {"file_id": file_id, "expires_at": expires}},
+                upsert=True,
+            )
+            for fp, file_id in file_ids.items()
+        ]
+        with span("mongo.media_cache.put"):
+            await _get_collection().bulk_write(ops, ordered=False)
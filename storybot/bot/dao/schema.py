@@ -0,0 +1,69 @@
+"""
+storybot.bot.dao.schema
+───────────────────────
+One-time index bootstrap, awaited in the aiogram startup hook.
+
+Each index below names the query it serves; after creation the live index
+set is compared with this table so a drifted deployment is reported at
+startup instead of showing up as slow queries.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from .settings_dao import _get_client
+
+log = logging.getLogger(__name__)
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "settings": [
+        # `_id` (user id) lookups in SettingsDAO.get/update use the built-in index
+        IndexModel([("target_username", ASCENDING)], sparse=True),
+        # SettingsDAO.iter_subscribers / iter_auto_targets (target scheduler mode)
+        IndexModel(
+            [("target_username", ASCENDING), ("interval", ASCENDING), ("auto_enabled", ASCENDING)]
+        ),
+        # SettingsDAO.iter_auto_enabled (startup rehydration)
+        IndexModel([("auto_enabled", ASCENDING)]),
+    ],
+    "stats": [
+        # per-user totals and daily breakdowns
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING), ("target_username", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("ts", DESCENDING)]),
+        IndexModel([("ts", ASCENDING)]),
+    ],
+    "searches": [
+        # per-user history, newest first
+        IndexModel([("user_id", ASCENDING), ("ts", DESCENDING)]),
+    ],
+    "deliveries": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "story_cache": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "media_cache": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+
+async def ensure_indexes() -> None:
+    """Create every index in INDEXES and verify the result."""
+    db = _get_client().get_default_database()
+    for coll_name, models in INDEXES.items():
+        coll = db[coll_name]
+        await coll.create_indexes(models)
+
+        live = await coll.index_information()
+        live_keys = {tuple(tuple(k) for k in info["key"]) for info in live.values()}
+        for model in models:
+            wanted = tuple(tuple(k) for k in model.document["key"].items())
+            if wanted not in live_keys:
+                log.error("index %s%s missing after bootstrap", coll_name, wanted)
+        log.info("%s indexes ready: %s", coll_name, sorted(live))
@@ -0,0 +1,112 @@
+"""
+storybot.bot.dao.search_dao
+───────────────────────────
+Append-only search history, one document per lookup, kept out of the
+`settings` documents that are read on every message.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError
+
+from .settings_dao import _get_client, _get_collection as _get_settings
+from .write_behind import BufferedWriter
+
+log = logging.getLogger(__name__)
+
+MIGRATION_BATCH = 500     # settings documents migrated per bulk insert
+MIGRATION_ID = "searches_out_of_settings"  # marker in the `migrations` collection
+
+
+def _get_collection() -> AsyncIOMotorCollection:
+    """Lazy access to the searches collection."""
+    return _get_client().get_default_database().searches
+
+
+def _get_migrations() -> AsyncIOMotorCollection:
+    """Lazy access to the one-document-per-migration marker collection."""
+    return _get_client().get_default_database().migrations
+
+
+writer = BufferedWriter("searches", _get_collection)
+
+
+class SearchDAO:
+    """Per-lookup search events (buffered, see write_behind)."""
+
+    @classmethod
+    async def add(cls, user_id: int, username: str, sent: int) -> None:
+        await writer.add(
+            {
+                "user_id": user_id,
+                "username": username.lower(),
+                "ts": datetime.utcnow(),
+                "sent": sent,
+            }
+        )
+
+    @classmethod
+    async def migrate_from_settings(cls) -> int:
+        """
+        Move legacy ``settings.searches`` arrays into this collection.
+
+        Copied events get an ``_id`` derived from the user and their array
+        position, so a batch re-copied after a crash before the ``$unset``
+        is skipped as a duplicate.  A marker document records completion,
+        and later starts return without scanning `settings`.
+        Returns the number of events moved.
+        """
+        if await _get_migrations().find_one({"_id": MIGRATION_ID}, {"_id": 1}):
+            return 0
+
+        settings_coll = _get_settings()
+        cursor = settings_coll.find(
+            {"searches": {"$exists": True}},
+            {"_id": 1, "searches": 1},
+            batch_size=MIGRATION_BATCH,
+        )
+        moved = 0
+        batch: List[Dict[str, Any]] = []
+        ids: List[int] = []
+
+        async def _flush() -> None:
+            if batch:
+                try:
+                    await _get_collection().insert_many(batch, ordered=False)
+                except BulkWriteError as exc:
+                    # events already copied by an interrupted earlier run
+                    errors = [
+                        e for e in exc.details.get("writeErrors", []) if e.get("code") != 11000
+                    ]
+                    if errors:
+                        raise
+            await settings_coll.update_many(
+                {"_id": {"$in": ids}}, {"$unset": {"searches": ""}}
+            )
+            batch.clear()
+            ids.clear()
+
+        async for doc in cursor:
+            ids.append(doc["_id"])
+            for pos, rec in enumerate(doc.get("searches") or []):
+                batch.append({**rec, "_id": f"legacy:{doc['_id']}:{pos}", "user_id": doc["_id"]})
+            if len(ids) >= MIGRATION_BATCH:
+                moved += len(batch)
+                await _flush()
+        moved += len(batch)
+        if ids:
+            await _flush()
+
+        await _get_migrations().update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"done_at": datetime.utcnow(), "moved": moved}},
+            upsert=True,
+        )
+        if moved:
+            log.info("Migrated %s embedded search records", moved)
+        return moved
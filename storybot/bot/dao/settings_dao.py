@@ -1,19 +1,26 @@
 """
 storybot.bot.dao.settings_dao
 ─────────────────────────────
-MongoDB access layer for user-specific auto-check settings.
+MongoDB access layer for user-specific auto-check settings, fronted by an
+in-process LRU of SettingsModel objects (write-through on upsert,
+invalidated through a change stream when replicas share the DB).
 """
 
 from __future__ import annotations        
 
+import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Dict
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Tuple
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
 from pydantic import BaseModel, Field
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
 
 from ..config import settings
+from ..services.metrics import span
 
 log = logging.getLogger(__name__)
 
@@ -32,15 +39,7 @@ def _get_client() -> AsyncIOMotorClient:
 
 def _get_collection() -> AsyncIOMotorCollection:
     """Return the settings collection inside the DB named in the DSN."""
-    db = _get_client().get_default_database() 
-    coll = db.settings
-
-
-    if not hasattr(coll, "_index_created"):
-        coll.create_index("target_username", sparse=True)
-        setattr(coll, "_index_created", True)
-
-    return coll
+    return _get_client().get_default_database().settings
 
 
 
@@ -61,44 +60,260 @@ class SettingsModel(BaseModel):
 
 
 
+_PROJECTION = {"_id": 1, "auto_enabled": 1, "interval": 1, "target_username": 1}
+
+WATCH_RETRY_DELAY = 5     # seconds before re-opening a broken change stream
+
+
+class _SettingsCache:
+    """
+    Bounded LRU of SettingsModel keyed by user id, with an entry TTL.
+
+    Reads that go to Mongo are bracketed by begin_read()/end_read(); if the
+    user was written while the read was in flight, its (older) result is
+    not cached, so a late reply cannot overwrite a fresh update.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._items: "OrderedDict[int, Tuple[float, SettingsModel]]" = OrderedDict()
+        self._clock = 0                      # bumped by every write / invalidation
+        self._readers: Dict[int, int] = {}   # in-flight Mongo reads per user
+        self._written: Dict[int, int] = {}   # clock of the last write during a read
+        self._started = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.expired = 0
+        self.stale_skips = 0
+
+    def get(self, user_id: int) -> SettingsModel | None:
+        entry = self._items.get(user_id)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._items[user_id]
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(user_id)
+        self.hits += 1
+        # handlers mutate what they get; never hand out the cached object
+        return entry[1].model_copy()
+
+    def put(self, model: SettingsModel) -> None:
+        """Store the result of a write."""
+        self._touch(model.user_id)
+        self._store(model)
+
+    def invalidate(self, user_id: int) -> None:
+        self._touch(user_id)
+        if self._items.pop(user_id, None) is not None:
+            self.invalidations += 1
+
+    def begin_read(self, user_id: int) -> int:
+        self._readers[user_id] = self._readers.get(user_id, 0) + 1
+        return self._clock
+
+    def end_read(self, user_id: int, token: int, model: SettingsModel | None) -> None:
+        """Cache *model* read since *token* unless the user was written meanwhile."""
+        stale = self._written.get(user_id, 0) > token
+        left = self._readers[user_id] - 1
+        if left:
+            self._readers[user_id] = left
+        else:
+            del self._readers[user_id]
+            self._written.pop(user_id, None)
+        if model is None:
+            return
+        if stale:
+            self.stale_skips += 1
+        else:
+            self._store(model)
+
+    def _touch(self, user_id: int) -> None:
+        self._clock += 1
+        if user_id in self._readers:
+            self._written[user_id] = self._clock
+
+    def _store(self, model: SettingsModel) -> None:
+        self._items[model.user_id] = (time.monotonic() + self._ttl, model.model_copy())
+        self._items.move_to_end(model.user_id)
+        while len(self._items) > self._maxsize:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        uptime = time.monotonic() - self._started
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "stale_skips": self.stale_skips,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "mongo_qps_saved": self.hits / uptime if uptime else 0.0,
+        }
+
+
+_cache = _SettingsCache(settings.settings_cache_size, settings.settings_cache_ttl)
+
+
 class SettingsDAO:
     """Async helpers for CRUD on `settings`."""
 
     @classmethod
     async def get(cls, user_id: int) -> SettingsModel:
-        doc: Dict[str, Any] | None = await _get_collection().find_one({"_id": user_id})
-        if doc is None:  
-            doc = {"_id": user_id}
-        return SettingsModel.model_validate(doc)
+        cached = _cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        model: SettingsModel | None = None
+        token = _cache.begin_read(user_id)
+        try:
+            with span("mongo.settings.get"):
+                doc: Dict[str, Any] | None = await _get_collection().find_one(
+                    {"_id": user_id}, _PROJECTION
+                )
+            if doc is None:  
+                doc = {"_id": user_id}
+            model = SettingsModel.model_validate(doc)
+        finally:
+            _cache.end_read(user_id, token, model)
+        return model
 
     @classmethod
     async def upsert(cls, model: SettingsModel) -> None:
         coll = _get_collection()
         payload: Dict[str, Any] = model.model_dump(by_alias=True, exclude_none=True)
 
-        log.info("UPSERT ► %s", payload)          
-        result = await coll.update_one(
-            {"_id": model.user_id},
-            {"$set": payload},
-            upsert=True,
-        )
-        log.info(                            
+        log.debug("UPSERT ► %s", payload)          
+        with span("mongo.settings.upsert"):
+            result = await coll.update_one(
+                {"_id": model.user_id},
+                {"$set": payload},
+                upsert=True,
+            )
+        log.debug(                            
             "UPSERT ◄ matched=%s  modified=%s  upserted_id=%s",
             result.matched_count,
             result.modified_count,
             result.upserted_id,
         )
+        _cache.put(model)
 
     @classmethod
-    async def add_search(cls, user_id: int, username: str, sent: int) -> None:
-        """Append a search event (keeps full history)."""
-        record = {
-            "username": username.lower(),
-            "ts": datetime.utcnow(),
-            "sent": sent,
+    async def update(cls, user_id: int, **changes: Any) -> SettingsModel:
+        """
+        ``$set`` only *changes* and return the resulting settings in one
+        round-trip (``find_one_and_update``), creating the document with
+        model defaults if it does not exist yet.
+
+        Raises
+        ------
+        ValueError
+            If a key is not a SettingsModel field.
+        """
+        bad = set(changes) - (set(SettingsModel.model_fields) - {"user_id"})
+        if bad:
+            raise ValueError(f"cannot update settings fields: {sorted(bad)}")
+
+        defaults = {
+            name: field.default
+            for name, field in SettingsModel.model_fields.items()
+            if name != "user_id" and name not in changes and field.default is not None
         }
-        await _get_collection().update_one(
-            {"_id": user_id},
-            {"$push": {"searches": record}},
-            upsert=True,
+        update: Dict[str, Any] = {"$set": changes}
+        if defaults:
+            update["$setOnInsert"] = defaults
+
+        with span("mongo.settings.update"):
+            doc = await _get_collection().find_one_and_update(
+                {"_id": user_id},
+                update,
+                projection=_PROJECTION,
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        log.debug("UPDATE %s ► %s", user_id, changes)
+        model = SettingsModel.model_validate(doc)
+        _cache.put(model)
+        return model
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, float]:
+        return _cache.stats()
+
+    @classmethod
+    async def watch_changes(cls) -> None:
+        """
+        Invalidate cached settings changed by other replicas.
+
+        Runs until cancelled.  Change streams need a replica set; on a
+        standalone server the watcher logs once and exits, leaving the
+        cache write-through only.
+        """
+        while True:
+            try:
+                async with _get_collection().watch(
+                    [{"$project": {"documentKey": 1}}]
+                ) as stream:
+                    log.info("Watching settings change stream")
+                    async for change in stream:
+                        _cache.invalidate(change["documentKey"]["_id"])
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as exc:
+                log.warning("settings change stream unavailable: %s", exc)
+                return
+            except Exception as exc:  # noqa: BLE001
+                log.warning("settings change stream broke (%s); reopening", exc)
+                await asyncio.sleep(WATCH_RETRY_DELAY)
+
+    @classmethod
+    async def iter_auto_enabled(
+        cls, batch_size: int = 1000
+    ) -> AsyncIterator[Tuple[int, int]]:
+        """Stream ``(user_id, interval)`` for every user with auto-check on."""
+        cursor = _get_collection().find(
+            {"auto_enabled": True},
+            {"_id": 1, "interval": 1},
+            batch_size=batch_size,
+        )
+        async for doc in cursor:
+            yield doc["_id"], doc.get("interval", 3)
+
+    @classmethod
+    async def iter_subscribers(
+        cls, target_username: str, interval: int, batch_size: int = 1000
+    ) -> AsyncIterator[int]:
+        """Stream ids of users auto-checking *target_username* every *interval* h."""
+        cursor = _get_collection().find(
+            {
+                "target_username": target_username,
+                "interval": interval,
+                "auto_enabled": True,
+            },
+            {"_id": 1},
+            batch_size=batch_size,
+        )
+        async for doc in cursor:
+            yield doc["_id"]
+
+    @classmethod
+    async def iter_auto_targets(cls) -> AsyncIterator[Tuple[str, int]]:
+        """Distinct ``(target_username, interval)`` pairs with auto-check on."""
+        cursor = _get_collection().aggregate(
+            [
+                {"$match": {"auto_enabled": True, "target_username": {"$ne": None}}},
+                {"$group": {"_id": {"t": "$target_username", "i": "$interval"}}},
+            ],
+            allowDiskUse=True,
         )
+        async for doc in cursor:
+            yield doc["_id"]["t"], doc["_id"].get("i") or 3
@@ -11,6 +11,7 @@ from motor.motor_asyncio import AsyncIOMotorCollection
 from pydantic import BaseModel, Field
 
 from .settings_dao import _get_client        
+from .write_behind import BufferedWriter
 import logging
 
 log = logging.getLogger(__name__)
@@ -20,15 +21,7 @@ log = logging.getLogger(__name__)
 
 def _get_collection() -> AsyncIOMotorCollection:
     """Lazy access to the stats collection."""
-    coll = _get_client().get_default_database().stats
-    if not hasattr(coll, "_index_created"):
-        coll.create_index(
-            [("user_id", 1), ("date", 1), ("target_username", 1)]
-        )
-        coll.create_index("ts")
-        setattr(coll, "_index_created", True)
-        log.debug("stats indexes created")
-    return coll
+    return _get_client().get_default_database().stats
 
 
 
@@ -42,8 +35,11 @@ class StatsRecord(BaseModel):
 
 
 
+writer = BufferedWriter("stats", _get_collection)
+
+
 class StatsDAO:
-    """Append-only event logger."""
+    """Append-only event logger (buffered, see write_behind)."""
 
     @classmethod
     async def add(cls, user_id: int, username: str, sent: int) -> None:
@@ -52,4 +48,4 @@ class StatsDAO:
             target_username=username.lower(),
             sent=sent,
         ).model_dump()
-        await _get_collection().insert_one(rec)
+        await writer.add(rec)
@@ -0,0 +1,52 @@
+"""
+storybot.bot.dao.story_cache_dao
+────────────────────────────────
+Second-tier story cache in MongoDB so fetched payloads survive restarts
+and are shared between bot replicas.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from ..services.metrics import span
+from .settings_dao import _get_client
+
+log = logging.getLogger(__name__)
+
+
+def _get_collection() -> AsyncIOMotorCollection:
+    """Lazy access to the story_cache collection."""
+    return _get_client().get_default_database().story_cache
+
+
+class StoryCacheDAO:
+    """Payloads keyed by normalised username, expired by a TTL index."""
+
+    @classmethod
+    async def get(cls, username: str) -> Optional[Dict[str, Any]]:
+        with span("mongo.story_cache.get"):
+            doc = await _get_collection().find_one(
+                {"_id": username, "expires_at": {"$gt": datetime.utcnow()}},
+                {"user_info": 1, "stories": 1, "expires_at": 1},
+            )
+        return doc
+
+    @classmethod
+    async def put(cls, username: str, data: Dict[str, Any], ttl: int) -> None:
+        with span("mongo.story_cache.put"):
+            await _get_collection().update_one(
+                {"_id": username},
+                {
+                    "$set": {
+                        "user_info": data["user_info"],
+                        "stories": data["stories"],
+                        "expires_at": datetime.utcnow() + timedelta(seconds=ttl),
+                    }
+                },
+                upsert=True,
+            )
@@ -0,0 +1,141 @@
+"""
+storybot.bot.dao.write_behind
+─────────────────────────────
+Buffered, asynchronous inserts for append-only collections.  Events are
+collected in memory and written with one ``insert_many`` once a batch is
+full or *max_delay* seconds have passed, keeping Mongo round-trips off the
+interactive request path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from ..services.metrics import span
+
+log = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """
+    Parameters
+    ----------
+    name : str
+        Label used in logs and metrics.
+    collection : callable
+        Returns the target collection (resolved lazily at flush time).
+    max_batch : int
+        Documents per ``insert_many``; reaching it triggers a flush.
+    max_delay : float
+        Longest time a document may sit in the buffer.
+    max_pending : int
+        Buffer cap; producers above it wait for a flush (backpressure).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        collection: Callable[[], AsyncIOMotorCollection],
+        max_batch: int = 500,
+        max_delay: float = 2.0,
+        max_pending: int = 10_000,
+    ) -> None:
+        self._name = name
+        self._collection = collection
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._max_pending = max_pending
+
+        self._buf: List[Tuple[float, Dict[str, Any]]] = []
+        self._wake: asyncio.Event | None = None
+        self._lock: asyncio.Lock | None = None
+        self._task: asyncio.Task | None = None
+
+        self._written = 0
+        self._failed = 0
+        self._flushes = 0
+        self._last_size = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._backpressured = 0
+
+    # ───────────────────────── lifecycle ─────────────────────────
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run(), name=f"write-behind-{self._name}")
+
+    async def stop(self) -> None:
+        """Stop the timer loop and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._lock is not None:
+            await self.flush()
+        log.info("%s writer stopped (%s)", self._name, self.stats())
+
+    # ───────────────────────── producer side ─────────────────────
+
+    async def add(self, doc: Dict[str, Any]) -> None:
+        """Buffer *doc*; only waits when the buffer is at its cap."""
+        self.start()
+        if len(self._buf) >= self._max_pending:
+            self._backpressured += 1
+            await self.flush()
+        self._buf.append((time.monotonic(), doc))
+        if len(self._buf) >= self._max_batch:
+            self._wake.set()
+
+    # ───────────────────────── consumer side ─────────────────────
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            while self._buf:
+                batch = self._buf[: self._max_batch]
+                del self._buf[: self._max_batch]
+                lag = time.monotonic() - batch[0][0]
+                try:
+                    with span(f"mongo.{self._name}.flush"):
+                        await self._collection().insert_many(
+                            [doc for _, doc in batch], ordered=False
+                        )
+                    self._written += len(batch)
+                except Exception as exc:  # noqa: BLE001
+                    self._failed += len(batch)
+                    log.error("%s writer dropped %s docs: %s", self._name, len(batch), exc)
+                self._flushes += 1
+                self._last_size = len(batch)
+                self._last_lag = lag
+                self._max_lag = max(self._max_lag, lag)
+
+    # ───────────────────────── metrics ───────────────────────────
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "pending": len(self._buf),
+            "written": self._written,
+            "failed": self._failed,
+            "flushes": self._flushes,
+            "flush_size_avg": self._written / self._flushes if self._flushes else 0.0,
+            "flush_size_last": self._last_size,
+            "lag_last": self._last_lag,
+            "lag_max": self._max_lag,
+            "backpressured": self._backpressured,
+        }
@@ -11,13 +11,26 @@ from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
 
-from ..dao.settings_dao import SettingsDAO
-from ..services.scheduler import remove_user_job, schedule_user_job
-from .story import fetch_and_push_stories
+from ..config import settings
+from ..dao.settings_dao import SettingsDAO, SettingsModel
+from ..services.scheduler import remove_user_job, schedule_target_job, schedule_user_job
+from .story import fetch_and_push_stories, fetch_and_push_target
 
 router = Router()
 
 
+def apply_schedule(st: SettingsModel) -> None:
+    """Create or drop the background job that serves *st* (SCHEDULER_MODE aware)."""
+    if settings.scheduler_mode == "target":
+        # target jobs drop themselves once their last subscriber is gone
+        if st.auto_enabled and st.target_username:
+            schedule_target_job(st.target_username, st.interval, fetch_and_push_target)
+    elif st.auto_enabled:
+        schedule_user_job(st.user_id, st.interval, fetch_and_push_stories)
+    else:
+        remove_user_job(st.user_id)
+
+
 
 def _interval_keyboard() -> InlineKeyboardMarkup:
     """Return an inline-keyboard with common auto-check intervals."""
@@ -38,22 +51,17 @@ def _interval_keyboard() -> InlineKeyboardMarkup:
 
 @router.message(Command("auto_on"))
 async def auto_on(msg: Message) -> None:
-    st = await SettingsDAO.get(msg.from_user.id)
-    st.auto_enabled = True
-    await SettingsDAO.upsert(st)
-    print(">>> UPSERT CALLED for", st.user_id)
+    st = await SettingsDAO.update(msg.from_user.id, auto_enabled=True)
 
-    schedule_user_job(st.user_id, st.interval, fetch_and_push_stories)
+    apply_schedule(st)
     await msg.answer(f"✅ Auto-check enabled every <b>{st.interval} h</b>.")
 
 
 @router.message(Command("auto_off"))
 async def auto_off(msg: Message) -> None:
-    st = await SettingsDAO.get(msg.from_user.id)
-    st.auto_enabled = False
-    await SettingsDAO.upsert(st)
+    st = await SettingsDAO.update(msg.from_user.id, auto_enabled=False)
 
-    remove_user_job(st.user_id)
+    apply_schedule(st)
     await msg.answer("🚫 Auto-check disabled.")
 
 
@@ -64,11 +72,8 @@ async def auto_off(msg: Message) -> None:
 async def change_interval(cb: CallbackQuery) -> None:
     hours = int(cb.data.split(":")[1])
 
-    st = await SettingsDAO.get(cb.from_user.id)
-    st.interval = hours
-    await SettingsDAO.upsert(st)
+    st = await SettingsDAO.update(cb.from_user.id, interval=hours)
 
-    if st.auto_enabled:
-        schedule_user_job(st.user_id, hours, fetch_and_push_stories)
+    apply_schedule(st)
 
     await cb.answer(f"Interval set to {hours} h")
@@ -7,58 +7,152 @@ and from APScheduler (auto-check).
 Public
 ------
 fetch_and_push_stories(user_id: int)
+fetch_and_push_target(username: str, hours: int)
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Dict, List, Optional
 
-from aiogram import Router, F, Bot
-from aiogram.client.default import DefaultBotProperties
+from aiogram import Router, F
 from aiogram.filters import Command
-from aiogram.types import Message
+from aiogram.types import InputMediaPhoto, InputMediaVideo, Message
 
 from ..config import settings
+from ..dao.delivery_dao import DeliveryDAO
+from ..dao.media_cache_dao import MediaCacheDAO
+from ..dao.search_dao import SearchDAO
 from ..dao.settings_dao import SettingsDAO
 from ..dao.stats_dao import StatsDAO
 
 from ..services.api_client import APIClient
 from ..services.auth_token import AuthTokenManager
-from ..services.browser import BrowserManager
+from ..services.browser import warmup
+from ..services.media_relay import relay
+from ..services.metrics import span
+from ..services.scheduler import get_bot, remove_target_job, remove_user_job
+from ..services.send_queue import Priority, send_queue
+from ..services.singleflight import SingleFlight
+from ..services.story_cache import story_cache
 from ..services.url_decoder import URLDecoder
 
 log = logging.getLogger(__name__)
 router = Router()
 
+_lookups = SingleFlight()
+
+ALBUM_SIZE = 10                 # Telegram's sendMediaGroup maximum
+FANOUT_CONCURRENCY = 20         # subscribers served in parallel per target job
+
 
 
 async def fetch_and_push_stories(user_id: int) -> None:
-    """Background task executed by APScheduler."""
+    """Background task executed by APScheduler (SCHEDULER_MODE=user)."""
     profile = await SettingsDAO.get(user_id)
+    if not profile.auto_enabled:
+        # turned off on a replica that does not run the scheduler
+        remove_user_job(user_id)
+        return
     if not profile.target_username:
         log.info("auto-job skipped: user %s has no target_username", user_id)
         return
 
-    bot = Bot(
-        token=settings.tg_token,
-        default=DefaultBotProperties(parse_mode="HTML"),
-    )
-    status = await bot.send_message(
+    await _push_to_user(user_id, profile.target_username)
+
+
+async def fetch_and_push_target(username: str, hours: int) -> None:
+    """
+    Background task executed by APScheduler (SCHEDULER_MODE=target).
+
+    Fetches *username* once and fans the result out to every user who
+    auto-checks it every *hours* hours.
+    """
+    subscribers = [
+        uid async for uid in SettingsDAO.iter_subscribers(username, hours)
+    ]
+    if not subscribers:
+        log.info("target-job @%s/%sh has no subscribers left", username, hours)
+        remove_target_job(username, hours)
+        return
+
+    data = await _lookup(username)
+    if not data:
+        # no refetch per subscriber: the next tick tries again
+        log.info("target-job @%s/%sh: nothing fetched, skipping fan-out", username, hours)
+        return
+    gate = asyncio.Semaphore(FANOUT_CONCURRENCY)
+
+    async def _one(uid: int) -> None:
+        async with gate:
+            try:
+                await _push_to_user(uid, username, data)
+            except Exception as exc:  # noqa: BLE001
+                log.warning("target-job @%s → %s failed: %s", username, uid, exc)
+
+    await asyncio.gather(*(_one(uid) for uid in subscribers))
+    log.info("target-job @%s/%sh pushed to %s users", username, hours, len(subscribers))
+
+
+async def _push_to_user(
+    user_id: int,
+    username: str,
+    data: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Deliver *username*'s stories to *user_id* as background traffic.
+
+    Only stories the user has not received yet are sent; when nothing is
+    new the tick stays silent.
+    """
+    if data is None:
+        data = await _lookup(username)
+    if not data or not data["stories"]:
+        return
+
+    by_fp = {
+        URLDecoder.fingerprint(URLDecoder.decode_embed_url(st["source"])): st
+        for st in data["stories"]
+    }
+    seen = await DeliveryDAO.delivered(user_id, username, by_fp)
+    fresh = {fp: st for fp, st in by_fp.items() if fp not in seen}
+    if not fresh:
+        log.debug("auto-check @%s → %s: nothing new", username, user_id)
+        return
+
+    bot = get_bot()
+    status = await send_queue.submit(
         user_id,
-        f"🔄 Auto-check @{profile.target_username} …",
+        lambda: bot.send_message(user_id, f"🔄 Auto-check @{username} …"),
+        priority=Priority.BACKGROUND,
     )
 
     class _PseudoMsg:
         """Tiny wrapper so we can reuse _process_username logic."""
         chat = status.chat
-        from_user = status.from_user
+        from_user = status.chat  # private chat: chat id == user id
 
         async def answer(_, text: str, **kw):
-            await bot.send_message(user_id, text, **kw)
+            return await bot.send_message(user_id, text, **kw)
 
-    await _process_username(_PseudoMsg(), status, profile.target_username)
+        async def answer_photo(_, photo, **kw):
+            return await bot.send_photo(user_id, photo, **kw)
+
+        async def answer_video(_, video, **kw):
+            return await bot.send_video(user_id, video, **kw)
+
+        async def answer_media_group(_, media, **kw):
+            return await bot.send_media_group(user_id, media, **kw)
+
+    await _process_username(
+        _PseudoMsg(),
+        status,
+        username,
+        priority=Priority.BACKGROUND,
+        data={**data, "stories": list(fresh.values())},
+    )
 
 
 
@@ -75,9 +169,10 @@ async def handle_username(msg: Message) -> None:
         await msg.answer("⚠️ Please provide a valid username.")
         return
 
-    profile = await SettingsDAO.get(msg.from_user.id)
-    profile.target_username = username
-    await SettingsDAO.upsert(profile)
+    profile = await SettingsDAO.update(msg.from_user.id, target_username=username)
+    if profile.auto_enabled and settings.scheduler_mode == "target":
+        from .auto import apply_schedule
+        apply_schedule(profile)
 
     status = await msg.answer(f"🔎 Looking up @{username} …")
     success = await _process_username(msg, status, username)
@@ -95,23 +190,27 @@ async def _process_username(
     requester: Message | Any,
     status: Message,
     username: str,
+    priority: Priority = Priority.INTERACTIVE,
+    data: Optional[Dict[str, Any]] = None,
 ) -> bool:
-    """Shared routine; returns *True* if at least one story was sent."""
-    try:
-        auth_token = AuthTokenManager.build_auth_token(username)
-
-        await status.edit_text("🌐 Launching headless browser …")
-        await BrowserManager().trigger_browser_async(username)
+    """
+    Shared routine; returns *True* if at least one story was sent.
 
-        await status.edit_text("⌛ Querying anonstories API …")
-        data = await APIClient().wait_for_stories(auth_token)
+    A pre-fetched *data* payload (target-mode fan-out) skips the lookup.
+    """
+    try:
+        if data is None:
+            await status.edit_text("⌛ Querying anonstories API …")
+            with span("story.lookup"):
+                data = await _lookup(username)
         if not data:
             await status.edit_text(
                 "❌ Nothing found (private or non-existent account)."
             )
             return False
 
-        await _send_profile_info(requester, data["user_info"])
+        with span("story.send_profile"):
+            await _send_profile_info(requester, data["user_info"], priority)
 
         stories = data["stories"]
         if not stories:
@@ -119,16 +218,19 @@ async def _process_username(
             return False
 
         await status.edit_text(f"📲 Found {len(stories)} stories — sending …")
-        for idx, story in enumerate(stories, 1):
-            await _send_single_story(requester, story, idx, len(stories))
-            if idx < len(stories):
-                await asyncio.sleep(0.4)
-        await SettingsDAO.add_search(
-			user_id=requester.from_user.id,
-			username=username,
-			sent=len(stories),
-		)
-        
+        with span("story.send_stories"):
+            delivered = await _send_stories(requester, stories, priority)
+        if not delivered:
+            await status.edit_text("💥 Could not send the stories, try again later.")
+            return False
+
+        # only what Telegram accepted; the rest is retried by the next check
+        await DeliveryDAO.mark(requester.from_user.id, username, delivered)
+        await SearchDAO.add(
+            user_id=requester.from_user.id,
+            username=username,
+            sent=len(delivered),
+        )
 
         await status.delete()
         return True
@@ -139,7 +241,94 @@ async def _process_username(
         return False
 
 
-async def _send_profile_info(msg: Message | Any, info: Dict[str, Any]) -> None:
+def lookup_stats() -> Dict[str, float]:
+    """Single-flight counters for the metrics endpoint."""
+    return _lookups.stats()
+
+
+async def _lookup(username: str) -> Optional[Dict[str, Any]]:
+    """Serve from the story cache, else join or start a single fetch."""
+    key = AuthTokenManager.normalize_username(username)
+    with span("story.cache_get"):
+        data = await story_cache.get(key)
+    if data is None:
+        data = await _lookups.do(key, _fetch_stories, key)
+    return data
+
+
+async def _fetch_stories(username: str) -> Optional[Dict[str, Any]]:
+    """
+    Warm anonstories up and poll it; shared by concurrent requesters.
+
+    Warm-up and polling run side by side: polls start as soon as the
+    warm-up has actually reached anonstories (a Chrome lease taken and the
+    navigation issued, or the HTTP page fetched), and whichever side
+    produces the payload first wins and cancels the other, so browser work
+    never delays a ready answer. Time spent waiting for a driver counts
+    neither against the poll deadline nor into the readiness samples.
+    If the strategy escalates after an empty poll (HTTP trigger → Chrome),
+    polling runs once more.
+    """
+    with span("story.auth_token"):
+        auth_token = AuthTokenManager.build_auth_token(username)
+    client = APIClient()
+    triggered = asyncio.Event()
+
+    async def _warm() -> Optional[Dict[str, Any]]:
+        try:
+            with span("story.warmup"):
+                return await warmup.warm_up(username, triggered)
+        except Exception as exc:  # noqa: BLE001 – polling still runs
+            log.warning("Warm-up failed for %s: %s", username, exc)
+            return None
+
+    async def _poll(started: float) -> Optional[Dict[str, Any]]:
+        with span("story.poll"):
+            return await client.wait_for_stories(auth_token, started=started)
+
+    warm_task = asyncio.ensure_future(_warm())
+    poll_task: Optional[asyncio.Future] = None
+    try:
+        # a warm-up that gives up without triggering still lets polling run
+        sent = asyncio.ensure_future(triggered.wait())
+        try:
+            await asyncio.wait({warm_task, sent}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sent.cancel()
+
+        if warm_task.done() and warm_task.result() is not None:
+            data = warm_task.result()
+        else:
+            poll_task = asyncio.ensure_future(_poll(time.monotonic()))
+            done, _ = await asyncio.wait(
+                {warm_task, poll_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if warm_task in done and poll_task not in done:
+                data = warm_task.result()
+                if data is None:
+                    data = await poll_task
+            else:
+                data = poll_task.result()
+    finally:
+        for task in (warm_task, poll_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+    outcome = "ready" if data else client.outcome or "exhausted"
+    if await warmup.followup(username, outcome):
+        with span("story.poll"):
+            data = await client.wait_for_stories(auth_token)
+
+    if data:
+        await story_cache.put(username, data)
+    return data
+
+
+async def _send_profile_info(
+    msg: Message | Any,
+    info: Dict[str, Any],
+    priority: Priority = Priority.INTERACTIVE,
+) -> None:
     avatar = URLDecoder.decode_embed_url(info.get("profile_pic_url", ""))
 
     caption = (
@@ -151,14 +340,128 @@ async def _send_profile_info(msg: Message | Any, info: Dict[str, Any]) -> None:
         f"• Following: {info['following']:,}"
     )
 
+    chat_id = msg.chat.id
     try:
         if avatar.startswith(("http://", "https://")):
-            await msg.answer_photo(avatar, caption=caption)
+            await send_queue.submit(
+                chat_id, lambda: msg.answer_photo(avatar, caption=caption), priority=priority
+            )
         else:
-            await msg.answer(caption)
+            await send_queue.submit(chat_id, lambda: msg.answer(caption), priority=priority)
     except Exception as exc:  # noqa: BLE001
         log.warning("send_profile_info: %s", exc)
-        await msg.answer(caption)
+        await send_queue.submit(chat_id, lambda: msg.answer(caption), priority=priority)
+
+
+async def _send_stories(
+    msg: Message | Any,
+    stories: List[Dict[str, Any]],
+    priority: Priority = Priority.INTERACTIVE,
+) -> List[str]:
+    """
+    Deliver *stories* as albums (STORY_DELIVERY=album) or one by one.
+
+    Media already uploaded once is sent by its cached Telegram file_id;
+    file_ids of freshly uploaded media are stored for the next send.
+
+    Returns the fingerprints of the stories Telegram accepted.
+    """
+    total = len(stories)
+    # shallow copies: the payload may be shared through the story cache
+    stories = [
+        {**st, "_src": URLDecoder.decode_embed_url(st["source"])} for st in stories
+    ]
+    for story in stories:
+        story["_fp"] = URLDecoder.fingerprint(story["_src"])
+
+    try:
+        file_ids = await MediaCacheDAO.get_many(st["_fp"] for st in stories)
+    except Exception as exc:  # noqa: BLE001
+        log.warning("media cache lookup failed: %s", exc)
+        file_ids = {}
+    learned: Dict[str, str] = {}
+    delivered: List[str] = []
+
+    if settings.story_delivery != "album":
+        for idx, story in enumerate(stories, 1):
+            if await _send_single_story(msg, story, idx, total, priority, file_ids, learned):
+                delivered.append(story["_fp"])
+    else:
+        for start in range(0, total, ALBUM_SIZE):
+            chunk = stories[start:start + ALBUM_SIZE]
+            delivered += await _send_album(
+                msg, chunk, start + 1, total, priority, file_ids, learned
+            )
+
+    try:
+        await MediaCacheDAO.put_many(learned)
+    except Exception as exc:  # noqa: BLE001
+        log.warning("media cache store failed: %s", exc)
+    return delivered
+
+
+def _sent_file_id(sent: Any) -> Optional[str]:
+    """file_id of the photo/video in a sent Message, if any."""
+    if getattr(sent, "photo", None):
+        return sent.photo[-1].file_id
+    if getattr(sent, "video", None):
+        return sent.video.file_id
+    return None
+
+
+async def _send_album(
+    msg: Message | Any,
+    chunk: List[Dict[str, Any]],
+    first_idx: int,
+    total: int,
+    priority: Priority,
+    file_ids: Dict[str, str],
+    learned: Dict[str, str],
+) -> List[str]:
+    """
+    One sendMediaGroup call; falls back to per-item sends if it fails.
+    Returns the fingerprints that were sent.
+    """
+    if len(chunk) == 1:
+        sent = await _send_single_story(
+            msg, chunk[0], first_idx, total, priority, file_ids, learned
+        )
+        return [chunk[0]["_fp"]] if sent else []
+
+    media = []
+    for idx, story in enumerate(chunk, first_idx):
+        ref = file_ids.get(story["_fp"], story["_src"])
+        caption = f"📖 Story {idx}/{total}"
+        if story["media_type"] == "image":
+            media.append(InputMediaPhoto(media=ref, caption=caption))
+        else:
+            media.append(InputMediaVideo(media=ref, caption=caption))
+
+    try:
+        sent = await send_queue.submit(
+            msg.chat.id,
+            lambda: msg.answer_media_group(media),
+            priority=priority,
+            weight=len(media),
+        )
+    except Exception as exc:  # noqa: BLE001
+        log.warning(
+            "Album %s-%s/%s failed (%s); sending items one by one",
+            first_idx, first_idx + len(chunk) - 1, total, exc,
+        )
+        return [
+            story["_fp"]
+            for idx, story in enumerate(chunk, first_idx)
+            if await _send_single_story(msg, story, idx, total, priority, file_ids, learned)
+        ]
+
+    delivered = []
+    for story, message in zip(chunk, sent or []):
+        delivered.append(story["_fp"])
+        file_id = _sent_file_id(message)
+        if file_id and story["_fp"] not in file_ids:
+            learned[story["_fp"]] = file_id
+    return delivered
 
 
 async def _send_single_story(
@@ -166,17 +469,41 @@ async def _send_single_story(
     story: Dict[str, Any],
     idx: int,
     total: int,
-) -> None:
-    src = URLDecoder.decode_embed_url(story["source"])
+    priority: Priority,
+    file_ids: Dict[str, str],
+    learned: Dict[str, str],
+) -> bool:
+    """Send one story, falling back to the relay; False if nothing got through."""
     caption = f"📖 Story {idx}/{total}"
+    send = msg.answer_photo if story["media_type"] == "image" else msg.answer_video
+    cached = file_ids.get(story["_fp"])
+    refs = [cached, story["_src"]] if cached else [story["_src"]]
+
+    sent = None
+    for ref in refs:
+        try:
+            sent = await send_queue.submit(
+                msg.chat.id, lambda: send(ref, caption=caption), priority=priority
+            )
+            break
+        except Exception as exc:  # noqa: BLE001
+            log.warning("Story %s/%s failed: %s", idx, total, exc)
+
+    if sent is None:
+        # Telegram could not fetch the URL itself; stream it through us
+        try:
+            async with relay(story["_src"]) as upload:
+                sent = await send_queue.submit(
+                    msg.chat.id, lambda: send(upload, caption=caption), priority=priority
+                )
+        except Exception as exc:  # noqa: BLE001
+            log.warning("Story %s/%s relay failed: %s", idx, total, exc)
+            return False
 
-    try:
-        if story["media_type"] == "image":
-            await msg.answer_photo(src, caption=caption)
-        else:
-            await msg.answer_video(src, caption=caption)
-    except Exception as exc:  # noqa: BLE001
-        log.warning("Story %s/%s failed: %s", idx, total, exc)
+    file_id = _sent_file_id(sent)
+    if file_id and file_id != cached:
+        learned[story["_fp"]] = file_id
+    return True
 
 
 def _validate_username(raw: Optional[str]) -> Optional[str]:
@@ -2,39 +2,150 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import threading
+from typing import Any, Awaitable, Callable, Dict
 
-from aiogram import Bot, Dispatcher
+from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.types import TelegramObject
 
 from storybot.healthcheck import start_health_server
 from .config import settings
+from .dao import search_dao, stats_dao
+from .dao.schema import ensure_indexes
+from .dao.search_dao import SearchDAO
+from .dao.settings_dao import SettingsDAO
 from .handlers import story, auto, common
-from .services.scheduler import start_scheduler
+from .services import http_session, media_relay, metrics
+from .services.api_client import readiness
+from .services import scheduler as scheduler_service
+from .services.browser import driver_pool, warmup
+from .services.browser_executor import browser_executor
+from .services.http_session import close_session, open_session
+from .services.scheduler import (
+    rehydrate_jobs,
+    rehydrate_target_jobs,
+    schedule_resync,
+    start_scheduler,
+    stop_scheduler,
+)
+from .services.send_queue import send_queue
+from .services.story_cache import story_cache
 
 log = logging.getLogger(__name__)
 
+_background: set[asyncio.Task] = set()
 
-async def _on_startup() -> None:
-    start_scheduler()
-    log.info("Scheduler started inside startup hook")
+
+def _spawn(coro) -> None:
+    """Run *coro* in the background, keeping a reference and logging failures."""
+    task = asyncio.create_task(coro)
+    _background.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _background.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            log.error("Background task failed", exc_info=t.exception())
+
+    task.add_done_callback(_done)
+
+
+class _ConcurrencyLimit(BaseMiddleware):
+    """Cap how many updates are handled at once (UPDATE_CONCURRENCY)."""
+
+    def __init__(self, limit: int) -> None:
+        self._sem = asyncio.Semaphore(limit)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        async with self._sem:
+            return await handler(event, data)
+
+
+def _register_metrics() -> None:
+    metrics.register("browser_pool", driver_pool.stats)
+    metrics.register("browser_executor", browser_executor.stats)
+    metrics.register("http", http_session.stats)
+    metrics.register("readiness", readiness.stats)
+    metrics.register("media_relay", media_relay.stats)
+    metrics.register("send_queue", send_queue.stats)
+    metrics.register("story_cache", story_cache.stats)
+    metrics.register("lookups", story.lookup_stats)
+    metrics.register("scheduler", scheduler_service.stats)
+    metrics.register("settings_cache", SettingsDAO.cache_stats)
+    metrics.register("stats_writer", stats_dao.writer.stats)
+    metrics.register("search_writer", search_dao.writer.stats)
+    if hasattr(warmup, "stats"):
+        metrics.register("warmup", warmup.stats)
+
+
+async def _on_startup(bot: Bot) -> None:
+    await ensure_indexes()
+    await open_session()
+    media_relay.cleanup_spool()
+    search_dao.writer.start()
+    stats_dao.writer.start()
+    send_queue.start()
+    _spawn(SearchDAO.migrate_from_settings())
+    if settings.settings_cache_watch:
+        _spawn(SettingsDAO.watch_changes())
+    if settings.run_scheduler:
+        start_scheduler(bot)
+        log.info("Scheduler started inside startup hook")
+        if settings.scheduler_mode == "target":
+            rehydrate, job = rehydrate_target_jobs, story.fetch_and_push_target
+        else:
+            rehydrate, job = rehydrate_jobs, story.fetch_and_push_stories
+        _spawn(rehydrate(job))
+        schedule_resync(rehydrate, job)
+    else:
+        log.info("RUN_SCHEDULER is off: auto-checks run on another replica")
+    await driver_pool.start()
+
+
+async def _on_shutdown() -> None:
+    stop_scheduler()
+    for task in list(_background):
+        task.cancel()
+    await asyncio.gather(*_background, return_exceptions=True)
+    await send_queue.stop()
+    await search_dao.writer.stop()
+    await stats_dao.writer.stop()
+    await driver_pool.close()
+    browser_executor.shutdown()
+    await close_session()
 
 
 async def _run() -> None:
-    threading.Thread(target=start_health_server, daemon=True).start()
+    _register_metrics()
+    health = await start_health_server()
 
     bot = Bot(
         token=settings.tg_token,
         default=DefaultBotProperties(parse_mode="HTML"),
     )
     dp = Dispatcher()
+    dp.update.outer_middleware(_ConcurrencyLimit(settings.update_concurrency))
 
     dp.include_router(story.router)
     dp.include_router(auto.router)
     dp.include_router(common.router)
 
     dp.startup.register(_on_startup)
-    await dp.start_polling(bot)
+    dp.shutdown.register(_on_shutdown)
+
+    try:
+        if settings.tg_mode == "webhook":
+            from .webhook import run_webhook
+            await run_webhook(bot, dp)
+        else:
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
+    finally:
+        await health.cleanup()
 
 
 def main() -> None:
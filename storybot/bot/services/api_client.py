@@ -2,57 +2,145 @@
 storybot.bot.services.api_client
 ────────────────────────────────
 Async wrapper around anonstories.com API.
+
+Polling is adaptive: ReadinessEstimator keeps recent "warm-up → JSON
+ready" times and wait_for_stories() schedules its polls at their
+quantiles, under an overall deadline, instead of a fixed back-off.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
-from contextlib import asynccontextmanager
-from typing import Any, Dict, Optional
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 
 import aiohttp
 
+from .http_session import get_session
+from .metrics import poll_attempts, span
+
 log = logging.getLogger(__name__)
 
 API_ENDPOINT = "https://anonstories.com/api/v1/story"
 API_TIMEOUT = 30          # seconds
-POLL_DELAY = 3            # base seconds between polls
+API_HEADERS = {
+    "Content-Type": "application/x-www-form-urlencoded",
+    "Accept": "application/json",
+}
+POLL_DELAY = 3            # base seconds between polls (until enough samples)
 MAX_RETRIES = 10          # max polling attempts
 
+READINESS_SAMPLES = 500   # recent ready-times kept by the estimator
+MIN_SAMPLES = 20          # below this the fixed schedule is used
+POLL_QUANTILES = (0.5, 0.75, 0.9, 0.95, 0.99)
+MIN_POLL_STEP = 2         # seconds between polls past the last quantile
+DEADLINE_FACTOR = 2       # deadline = p99 × factor …
+MIN_DEADLINE = 15         # … clamped to [MIN_DEADLINE, MAX_DEADLINE]
+MAX_DEADLINE = 120
+GONE_STATUSES = (404, 410)
+
+
+def is_ready(data: Dict[str, Any]) -> bool:
+    """True once anonstories has prepared profile info and the story list."""
+    return bool(data.get("user_info")) and data.get("stories") is not None
+
+
+def is_gone(data: Dict[str, Any]) -> bool:
+    """Answers that will not turn into stories however long we poll."""
+    if data.get("_http_status") in GONE_STATUSES:
+        return True
+    info = data.get("user_info") or {}
+    return bool(info.get("is_private"))
+
+
+class ReadinessEstimator:
+    """Sliding window of observed readiness times and the poll plan they imply."""
+
+    def __init__(self, maxlen: int = READINESS_SAMPLES) -> None:
+        self._samples: Deque[float] = deque(maxlen=maxlen)
+        self.gone = 0
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def record_between(self, last_miss: float, hit: float) -> None:
+        """
+        Record a readiness time only known to lie in ``(last_miss, hit]``.
+
+        Polls start at the current median, so the poll that succeeds can be
+        much later than the moment the JSON became ready; recording the
+        midpoint instead of *hit* lets the estimate move down again when
+        anonstories gets faster.
+        """
+        self.record((last_miss + hit) / 2)
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return math.nan
+        pos = q * (len(ordered) - 1)
+        lo, hi = math.floor(pos), math.ceil(pos)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+    def deadline(self) -> float:
+        if len(self._samples) < MIN_SAMPLES:
+            return sum(_fixed_delays(MAX_RETRIES))
+        return min(max(self.quantile(0.99) * DEADLINE_FACTOR, MIN_DEADLINE), MAX_DEADLINE)
+
+    def schedule(self) -> List[float]:
+        """Poll instants in seconds after the warm-up trigger."""
+        if len(self._samples) < MIN_SAMPLES:
+            plan, at = [], 0.0
+            for delay in _fixed_delays(MAX_RETRIES):
+                at += delay
+                plan.append(at)
+            return plan
+
+        deadline = self.deadline()
+        plan: List[float] = []
+        for q in POLL_QUANTILES:
+            at = round(self.quantile(q), 1)
+            if not plan or at > plan[-1]:
+                plan.append(at)
+        step = max(plan[-1] - plan[0], MIN_POLL_STEP)
+        while plan[-1] + step <= deadline:
+            plan.append(plan[-1] + step)
+        return plan
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "samples": len(self._samples),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "deadline": self.deadline(),
+            "gone": self.gone,
+        }
+
+
+def _fixed_delays(n: int) -> List[float]:
+    """The original back-off between polls: 0, 3, 3, 6, 6, 6, 12, … capped at 30 s."""
+    return [0.0] + [min(POLL_DELAY * (2 ** (i // 3)), 30) for i in range(1, n)]
+
+
+readiness = ReadinessEstimator()
+
 
 class APIClient:
     """Lightweight async client for anonstories.com."""
 
     def __init__(self, timeout: int = API_TIMEOUT) -> None:
         self._timeout = aiohttp.ClientTimeout(total=timeout)
-
-
-    @asynccontextmanager
-    async def _session(self):
-        async with aiohttp.ClientSession(
-            headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
-                    " AppleWebKit/537.36 (KHTML, like Gecko)"
-                ),
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Accept": "application/json",
-            },
-            timeout=self._timeout,
-        ) as sess:
-            yield sess
-
+        self.outcome: Optional[str] = None   # last wait_for_stories: ready / gone / exhausted
 
     async def fetch_story_data(self, auth_token: str) -> Dict[str, Any]:
         """Single POST request, returns raw JSON or empty dict on failure."""
         try:
-            async with self._session() as sess:
-                async with sess.post(API_ENDPOINT, data={"auth": auth_token}) as r:
-                    if r.status != 200:
-                        log.warning("anonstories HTTP %s", r.status)
-                        return {}
-                    return await r.json()
+            with span("api.request"):
+                return await self._post(auth_token)
         except asyncio.TimeoutError:
             log.warning("anonstories request timed-out")
             return {}
@@ -60,21 +148,66 @@ class APIClient:
             log.exception("anonstories error: %s", exc)
             return {}
 
+    async def _post(self, auth_token: str) -> Dict[str, Any]:
+        sess = await get_session()
+        async with sess.post(
+            API_ENDPOINT,
+            data={"auth": auth_token},
+            headers=API_HEADERS,
+            timeout=self._timeout,
+        ) as r:
+            if r.status != 200:
+                log.warning("anonstories HTTP %s", r.status)
+                return {"_http_status": r.status}
+            return await r.json()
+
     async def wait_for_stories(
-        self, auth_token: str, max_retries: int = MAX_RETRIES
+        self,
+        auth_token: str,
+        max_retries: int = MAX_RETRIES,
+        started: float | None = None,
     ) -> Optional[Dict[str, Any]]:
         """
-        Poll anonstories with exponential back-off until stories arrive
-        or *max_retries* is reached.
+        Poll anonstories until stories arrive, following the readiness
+        estimator's schedule.
+
+        Parameters
+        ----------
+        started : float, optional
+            ``time.monotonic()`` of the warm-up trigger; poll times and the
+            recorded readiness sample are measured from it.
+
+        Returns None after *max_retries* polls, past the deadline, or as soon
+        as the account is clearly private or missing.
         """
-        for attempt in range(max_retries):
-            delay = min(POLL_DELAY * (2 ** (attempt // 3)), 30)
-            if attempt:
+        started = time.monotonic() if started is None else started
+        plan = readiness.schedule()[:max_retries]
+        last_miss = 0.0
+        for attempt, at in enumerate(plan):
+            delay = at - (time.monotonic() - started)
+            if delay > 0:
                 await asyncio.sleep(delay)
 
+            polled = time.monotonic() - started
             data = await self.fetch_story_data(auth_token)
-            if data.get("user_info") and data.get("stories") is not None:
+            if is_ready(data):
+                readiness.record_between(last_miss, polled)
+                self.outcome = "ready"
+                poll_attempts.observe("ready", attempt + 1)
                 return data
+            if is_gone(data):
+                readiness.gone += 1
+                self.outcome = "gone"
+                poll_attempts.observe("gone", attempt + 1)
+                log.info("anonstories: account private or missing, giving up")
+                return None
+            last_miss = polled
 
-        log.warning("anonstories: no data after %s retries", max_retries)
+        self.outcome = "exhausted"
+        poll_attempts.observe("exhausted", len(plan))
+        log.warning(
+            "anonstories: no data after %s polls / %.0fs",
+            len(plan),
+            time.monotonic() - started,
+        )
         return None
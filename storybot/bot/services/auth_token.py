@@ -22,6 +22,11 @@ log = logging.getLogger(__name__)
 class AuthTokenManager:
     """Single static helper used by story handler & background tasks."""
 
+    @staticmethod
+    def normalize_username(username: str) -> str:
+        """Canonical form of *username* used for tokens and cache keys."""
+        return username.strip().lower()
+
     @staticmethod
     def build_auth_token(username: str) -> str:
         """
@@ -35,7 +40,7 @@ class AuthTokenManager:
         if not username or not username.strip():
             raise ValueError("username must not be empty")
 
-        uname = username.strip().lower()
+        uname = AuthTokenManager.normalize_username(username)
         raw = f"-1::{uname}::{SHARED_SECRET}"
         b64 = base64.b64encode(raw.encode()).decode()
 
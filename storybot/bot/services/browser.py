@@ -1,7 +1,9 @@
 """
 storybot.bot.services.browser
 ─────────────────────────────
-Launches a headless Chrome session so that anonstories prepares JSON for us.
+Warm-up strategies that make anonstories prepare JSON for us: a plain HTTP
+replay of the page's requests and a pool of warm headless Chrome sessions
+used as the fallback.
 """
 
 from __future__ import annotations
@@ -9,53 +11,553 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import signal
+import time
+from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+import aiohttp
 import undetected_chromedriver as uc
 
-_BROWSERS_SEMAPHORE = asyncio.Semaphore(3)
+from ..config import settings
+from .api_client import APIClient, is_gone, is_ready
+from .auth_token import AuthTokenManager
+from .browser_executor import (
+    BrowserExecutor,
+    BrowserSaturated,
+    BrowserTimeout,
+    browser_executor,
+)
+from .http_session import get_session
+from .metrics import span
+
 BROWSER_TIMEOUT = 30  # seconds
+VIEW_URL = "https://anonstories.com/view/{username}"
+HTTP_MISS_LIMIT = 5       # consecutive HTTP misses before Chrome goes first
+HTTP_COOLDOWN = 300       # seconds to stay Chrome-first after that
 
 log = logging.getLogger(__name__)
 
 
-class BrowserManager:
-    """Spawn short-lived headless Chrome sessions."""
-
-    def __init__(self) -> None:
-        self._options = uc.ChromeOptions()
-        self._options.add_argument("--headless=new")
-        self._options.add_argument("--disable-gpu")
-        self._options.add_argument("--no-sandbox")
-        self._options.add_argument("--disable-dev-shm-usage")
-        self._options.add_argument(
-            "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+def _build_options() -> uc.ChromeOptions:
+    """Fresh options object – uc refuses to reuse one across drivers."""
+    options = uc.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(
+        "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+    )
+    options.binary_location = os.getenv("CHROME_BINARY", "/usr/bin/google-chrome")
+    return options
+
+
+@dataclass
+class _PooledDriver:
+    """A live Chrome instance plus its page counter."""
+
+    driver: uc.Chrome
+    pages: int = 0
+    created: float = field(default_factory=time.monotonic)
+
+    def healthy(self) -> bool:
+        """Cheap round-trip to chromedriver; False if the browser is gone."""
+        try:
+            _ = self.driver.current_url
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def kill(self) -> None:
+        """SIGKILL chromedriver and the browser; unblocks a hung call."""
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        pids = [getattr(self.driver, "browser_pid", None), getattr(process, "pid", None)]
+        for pid in filter(None, pids):
+            try:
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass
+
+
+class DriverPool:
+    """
+    Fixed-size pool of pre-launched headless Chrome drivers.
+
+    Drivers are leased per lookup, health-checked before use and recycled
+    after *max_pages* navigations or as soon as a page fails. All blocking
+    driver calls go through *executor*.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_pages: int,
+        executor: BrowserExecutor = browser_executor,
+    ) -> None:
+        self._size = size
+        self._max_pages = max_pages
+        self._executor = executor
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[_PooledDriver] = []
+        self._in_use = 0
+        self._waiting = 0
+        self._last_release = time.monotonic()
+
+        self._leases = 0
+        self._launched = 0
+        self._reused = 0
+        self._recycled = 0
+        self._unhealthy = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    # ───────────────────────── lifecycle ─────────────────────────
+
+    async def start(self) -> None:
+        """Pre-launch every slot so the first lookups hit a warm browser."""
+        missing = self._size - len(self._idle) - self._in_use
+        results = await asyncio.gather(
+            *(
+                self._executor.call(self._launch, on_late=_PooledDriver.quit)
+                for _ in range(missing)
+            ),
+            return_exceptions=True,
         )
+        for res in results:
+            if isinstance(res, _PooledDriver):
+                self._idle.append(res)
+            else:
+                log.warning("Chrome pre-launch failed: %s", res)
+        log.info("Chrome pool warm: %s/%s drivers", len(self._idle), self._size)
 
-        chrome_binary = os.getenv("CHROME_BINARY", "/usr/bin/google-chrome")
-        self._options.binary_location = chrome_binary
+    async def close(self) -> None:
+        """Quit all idle drivers (leased ones are quit when returned)."""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._discard(p) for p in idle))
+        log.info("Chrome pool closed (%s drivers quit)", len(idle))
 
-    async def trigger_browser_async(self, username: str) -> None:
-        """Run _open_page in a thread-executor, limited by a semaphore."""
-        loop = asyncio.get_running_loop()
-        async with _BROWSERS_SEMAPHORE:
-            await loop.run_in_executor(None, self._open_page, username)
+    # ───────────────────────── leasing ───────────────────────────
 
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[_PooledDriver]:
+        """
+        Borrow a healthy driver for one navigation.
 
-    def _open_page(self, username: str) -> None:
-        url = f"https://anonstories.com/view/{username}"
-        log.debug("Headless Chrome → %s", url)
+        Exceptions raised inside the block mark the driver as crashed, so it
+        is quit and replaced instead of going back to the pool.
+        """
+        started = time.monotonic()
+        self._waiting += 1
+        try:
+            with span("browser.lease_wait"):
+                await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - started
+        self._leases += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._in_use += 1
 
+        # The checkout may be launching Chrome; a cancelled caller must not
+        # leave that driver behind, so it finishes detached and is parked.
+        checkout = asyncio.ensure_future(self._checkout())
         try:
-            driver = uc.Chrome(options=self._options, driver_executable_path=None)
-            driver.set_page_load_timeout(BROWSER_TIMEOUT)
-            driver.get(url)
-            driver.find_element("tag name", "body") 
-            log.debug("Page loaded for %s", username)
-        except Exception as exc:
-            log.warning("Browser error for %s: %s", username, exc)
+            with span("browser.checkout"):
+                pooled = await asyncio.shield(checkout)
+        except asyncio.CancelledError:
+            checkout.add_done_callback(self._park)
+            raise
+        except BaseException:
+            self._release()
+            raise
+
+        try:
+            failed = False
+            try:
+                yield pooled
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                pooled.pages += 1
+                if failed or pooled.pages >= self._max_pages:
+                    self._recycled += 1
+                    await self._discard(pooled)
+                else:
+                    self._idle.append(pooled)
         finally:
+            self._release()
+
+    def _release(self) -> None:
+        self._in_use -= 1
+        self._last_release = time.monotonic()
+        self._slots.release()
+
+    def _park(self, checkout: asyncio.Future) -> None:
+        """Return a driver checked out for a caller that was cancelled."""
+        if checkout.cancelled():
+            pass
+        elif checkout.exception() is not None:
+            log.info("Abandoned Chrome checkout failed: %s", checkout.exception())
+        else:
+            self._idle.append(checkout.result())
+        self._release()
+
+    async def _checkout(self) -> _PooledDriver:
+        while self._idle:
+            pooled = self._idle.pop()
             try:
-                driver.quit()
-            except Exception:
-                pass
+                alive = await self._executor.call(pooled.healthy, reap=pooled.kill)
+            except BrowserTimeout:
+                alive = False
+            if alive:
+                self._reused += 1
+                return pooled
+            self._unhealthy += 1
+            log.info("Discarding dead Chrome driver after %s pages", pooled.pages)
+            await self._discard(pooled)
+        return await self._executor.call(self._launch, on_late=_PooledDriver.quit)
+
+    async def _discard(self, pooled: _PooledDriver) -> None:
+        try:
+            await self._executor.call(pooled.quit, reap=pooled.kill)
+        except BrowserTimeout:
+            pass
+
+    def _launch(self) -> _PooledDriver:
+        driver = uc.Chrome(options=_build_options(), driver_executable_path=None)
+        driver.set_page_load_timeout(BROWSER_TIMEOUT)
+        self._launched += 1
+        return _PooledDriver(driver)
+
+    # ───────────────────────── metrics ───────────────────────────
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of pool counters (lease wait in seconds)."""
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "waiting": self._waiting,
+            "leases": self._leases,
+            "launched": self._launched,
+            "reused": self._reused,
+            "recycled": self._recycled,
+            "unhealthy": self._unhealthy,
+            "lease_wait_avg": self._wait_total / self._leases if self._leases else 0.0,
+            "lease_wait_max": self._wait_max,
+            "last_release_age": time.monotonic() - self._last_release,
+        }
+
+
+driver_pool = DriverPool(settings.browser_pool_size, settings.browser_max_pages)
+_detached: set[asyncio.Task] = set()   # leases finishing after a cancel
+
+
+class BrowserManager:
+    """Open anonstories pages on a driver leased from the shared pool."""
+
+    def __init__(
+        self,
+        pool: DriverPool = driver_pool,
+        executor: BrowserExecutor = browser_executor,
+    ) -> None:
+        self._pool = pool
+        self._executor = executor
+
+    async def trigger_browser_async(
+        self,
+        username: str,
+        triggered: asyncio.Event | None = None,
+    ) -> None:
+        """
+        Run _open_page on the Chrome executor with a pooled driver.
+
+        *triggered* is set once a driver is leased and the navigation is
+        issued – time spent waiting for the pool is not anonstories' time.
+
+        Lookups beyond the executor's queue limit are skipped at once, and
+        the caller falls back to plain polling. Cancelling the caller does
+        not wait for Chrome: the navigation finishes in its thread and the
+        driver goes back to the pool from a background task.
+        """
+        lease = self._pool.lease()
+        try:
+            with self._executor.queued():
+                pooled = await lease.__aenter__()
+        except BrowserSaturated as exc:
+            log.info("Skipping Chrome warm-up for %s: %s", username, exc)
+            return
+        except Exception as exc:  # noqa: BLE001
+            log.warning("Browser error for %s: %s", username, exc)
+            return
+
+        page = self._executor.submit(self._open_page, pooled, username, reap=pooled.kill)
+        if triggered is not None:
+            triggered.set()
+        try:
+            with span("browser.page"):
+                await asyncio.shield(page)
+        except asyncio.CancelledError:
+            task = asyncio.ensure_future(self._release_after(lease, page, username))
+            _detached.add(task)
+            task.add_done_callback(_detached.discard)
+            raise
+        except Exception as exc:  # noqa: BLE001
+            log.warning("Browser error for %s: %s", username, exc)
+            await lease.__aexit__(type(exc), exc, exc.__traceback__)
+        else:
+            await lease.__aexit__(None, None, None)
+
+    @staticmethod
+    async def _release_after(lease, page: asyncio.Future, username: str) -> None:
+        """Return a lease once its abandoned navigation has finished."""
+        try:
+            await page
+        except Exception as exc:  # noqa: BLE001
+            log.debug("Abandoned page for %s failed: %s", username, exc)
+            await lease.__aexit__(type(exc), exc, exc.__traceback__)
+        else:
+            await lease.__aexit__(None, None, None)
+
+    @staticmethod
+    def _open_page(pooled: _PooledDriver, username: str) -> None:
+        url = VIEW_URL.format(username=username)
+        log.debug("Headless Chrome → %s", url)
+
+        pooled.driver.get(url)
+        pooled.driver.find_element("tag name", "body")
+        log.debug("Page loaded for %s", username)
+
+
+
+# ─────────────────────────── warm-up strategies ───────────────────────────
+
+
+class WarmupStrategy(ABC):
+    """Something that makes anonstories start preparing *username*."""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def warm_up(
+        self,
+        username: str,
+        triggered: asyncio.Event | None = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Trigger anonstories for *username*.
+
+        *triggered* is set as soon as anonstories has actually been asked
+        (page requested, navigation issued); a strategy that never gets that
+        far leaves it unset.
+
+        Returns
+        -------
+        dict | None
+            The ready story payload if the strategy already obtained it,
+            otherwise None and the caller polls `APIClient` as usual.
+        """
+
+    async def followup(self, username: str, outcome: str) -> bool:
+        """
+        Report how polling after `warm_up` went: ``"ready"``, ``"gone"``
+        (private or missing account) or ``"exhausted"``.
+
+        Returns True when the strategy ran a heavier warm-up because the
+        poll came back empty, so the caller should poll once more.
+        """
+        return False
+
+
+class ChromeWarmup(WarmupStrategy):
+    """Open the view page in a pooled headless Chrome."""
+
+    name = "chrome"
+
+    def __init__(self, manager: BrowserManager | None = None) -> None:
+        self._manager = manager or BrowserManager()
+
+    async def warm_up(
+        self,
+        username: str,
+        triggered: asyncio.Event | None = None,
+    ) -> Optional[Dict[str, Any]]:
+        await self._manager.trigger_browser_async(username, triggered)
+        return None
+
+
+class HttpWarmup(WarmupStrategy):
+    """
+    Replay the page's own requests without a browser: fetch the view page,
+    then issue the same API call its script makes.
+    """
+
+    name = "http"
+
+    def __init__(self, timeout: int = BROWSER_TIMEOUT) -> None:
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def warm_up(
+        self,
+        username: str,
+        triggered: asyncio.Event | None = None,
+    ) -> Optional[Dict[str, Any]]:
+        data = await self.trigger(username, triggered)
+        return data if data and is_ready(data) else None
+
+    async def trigger(
+        self,
+        username: str,
+        triggered: asyncio.Event | None = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Replay the page load and its API call.
+
+        Returns the API answer (ready or not), or None if the page could not
+        be fetched and anonstories was never triggered. *triggered* is set
+        once the page has loaded.
+        """
+        url = VIEW_URL.format(username=username)
+        try:
+            sess = await get_session()
+            with span("warmup.http_page"):
+                async with sess.get(url, timeout=self._timeout) as r:
+                    await r.read()
+                    if r.status != 200:
+                        log.debug("HTTP warm-up %s → %s", url, r.status)
+                        return None
+        except Exception as exc:  # noqa: BLE001
+            log.debug("HTTP warm-up failed for %s: %s", username, exc)
+            return None
+        if triggered is not None:
+            triggered.set()
+
+        token = AuthTokenManager.build_auth_token(username)
+        return await APIClient().fetch_story_data(token)
+
+
+class AutoWarmup(WarmupStrategy):
+    """
+    Trigger anonstories over HTTP and use Chrome only when that is not enough.
+
+    A completed HTTP trigger counts as a warm-up; Chrome runs when the page
+    cannot be fetched, or in `followup` when polling after an HTTP trigger
+    ran out without stories. A private or missing account is an answer,
+    not a miss, and never escalates. After HTTP_MISS_LIMIT consecutive misses the HTTP path
+    is skipped for HTTP_COOLDOWN seconds, so a site change does not add a
+    wasted round-trip to every lookup.
+    """
+
+    name = "auto"
+
+    def __init__(
+        self,
+        http: HttpWarmup | None = None,
+        chrome: WarmupStrategy | None = None,
+    ) -> None:
+        self._http = http or HttpWarmup()
+        self._chrome = chrome or ChromeWarmup()
+        self._misses = 0
+        self._http_off_until = 0.0
+        self._pending: set[str] = set()   # usernames warmed over HTTP, poll outcome unknown
+
+        self._http_hits = 0
+        self._http_misses = 0
+        self._chrome_runs = 0
+
+    async def warm_up(
+        self,
+        username: str,
+        triggered: asyncio.Event | None = None,
+    ) -> Optional[Dict[str, Any]]:
+        if time.monotonic() >= self._http_off_until:
+            data = await self._http.trigger(username, triggered)
+            if data is not None:
+                if is_ready(data):
+                    self._hit()
+                    return data
+                if is_gone(data):
+                    self._hit()  # answered; polling will give up at once
+                else:
+                    self._pending.add(username)
+                return None
+            self._miss()
+
+        return await self._run_chrome(username, triggered)
+
+    async def followup(self, username: str, outcome: str) -> bool:
+        if username not in self._pending:
+            return False
+        self._pending.discard(username)
+        if outcome != "exhausted":
+            self._hit()
+            return False
+        self._miss()
+        await self._run_chrome(username)
+        return True
+
+    async def _run_chrome(
+        self,
+        username: str,
+        triggered: asyncio.Event | None = None,
+    ) -> None:
+        self._chrome_runs += 1
+        await self._chrome.warm_up(username, triggered)
+
+    def _hit(self) -> None:
+        self._misses = 0
+        self._http_hits += 1
+
+    def _miss(self) -> None:
+        self._http_misses += 1
+        self._misses += 1
+        if self._misses >= HTTP_MISS_LIMIT:
+            log.warning(
+                "HTTP warm-up missed %s times in a row; Chrome-first for %ss",
+                self._misses,
+                HTTP_COOLDOWN,
+            )
+            self._misses = 0
+            self._http_off_until = time.monotonic() + HTTP_COOLDOWN
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "http_hits": self._http_hits,
+            "http_misses": self._http_misses,
+            "chrome_runs": self._chrome_runs,
+            "http_disabled": int(time.monotonic() < self._http_off_until),
+        }
+
+
+_STRATEGIES = {
+    "auto": AutoWarmup,
+    "http": HttpWarmup,
+    "chrome": ChromeWarmup,
+}
+
+
+def get_warmup_strategy(name: str = settings.warmup_strategy) -> WarmupStrategy:
+    """Build the strategy configured via WARMUP_STRATEGY."""
+    try:
+        return _STRATEGIES[name]()
+    except KeyError:
+        raise ValueError(f"unknown warm-up strategy: {name!r}") from None
+
+
+warmup = get_warmup_strategy()
@@ -0,0 +1,192 @@
+"""
+storybot.bot.services.browser_executor
+──────────────────────────────────────
+Dedicated thread pool for blocking Chrome calls, kept apart from the loop's
+default executor. Every task runs under a hard deadline; a task that
+overruns has its driver killed so the stuck thread unblocks, or – when
+there is nothing to kill yet, as with a launch – is left to finish and
+cleaned up by an *on_late* hook. Callers are turned away early once too
+many lookups are already waiting.
+
+Public
+------
+BrowserExecutor / browser_executor / BrowserSaturated / BrowserTimeout
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from ..config import settings
+
+EXTRA_WORKERS = 2  # threads beyond the driver pool size, for quits and launches
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BrowserSaturated(RuntimeError):
+    """Raised instead of queueing when the browser backlog is full."""
+
+
+class BrowserTimeout(TimeoutError):
+    """A Chrome task overran its deadline and was reaped."""
+
+
+class BrowserExecutor:
+    """
+    Bounded thread pool with per-task deadlines and admission control.
+
+    Parameters
+    ----------
+    workers:
+        Threads reserved for Chrome calls.
+    max_queue:
+        Callers allowed to wait for a browser at once; the next one gets
+        `BrowserSaturated` immediately.
+    deadline:
+        Hard limit in seconds for a single task.
+    """
+
+    def __init__(self, workers: int, max_queue: int, deadline: float) -> None:
+        self._workers = workers
+        self._max_queue = max_queue
+        self._deadline = deadline
+        self._threads = ThreadPoolExecutor(workers, thread_name_prefix="chrome")
+
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._killed = 0
+        self._abandoned = 0
+        self._rejected = 0
+
+    # ───────────────────────── admission ─────────────────────────
+
+    @contextmanager
+    def queued(self) -> Iterator[None]:
+        """
+        Count the caller as waiting for a browser, or reject it.
+
+        Raises
+        ------
+        BrowserSaturated
+            When *max_queue* callers are already waiting.
+        """
+        if self._queued >= self._max_queue:
+            self._rejected += 1
+            raise BrowserSaturated(f"{self._queued} browser lookups already queued")
+        self._queued += 1
+        try:
+            yield
+        finally:
+            self._queued -= 1
+
+    # ───────────────────────── execution ─────────────────────────
+
+    def submit(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        reap: Optional[Callable[[], None]] = None,
+        on_late: Optional[Callable[[T], None]] = None,
+    ) -> asyncio.Task:
+        """
+        Start ``func(*args)`` on a Chrome thread.
+
+        The returned task resolves to the call's result, or raises
+        `BrowserTimeout` once the deadline passes; *reap* is called at that
+        point to kill whatever the thread is blocked on. If the call still
+        returns after the timeout, ``on_late(result)`` runs on a Chrome
+        thread so nothing it produced is leaked. The task runs to
+        completion even if whoever awaits it is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(self._threads, func, *args)
+        self._submitted += 1
+        self._running += 1
+        fut.add_done_callback(self._finished)
+        name = getattr(func, "__name__", "task")
+        return loop.create_task(self._guard(fut, reap, on_late, name))
+
+    async def call(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        reap: Optional[Callable[[], None]] = None,
+        on_late: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """Await `submit` – for callers that do not need to detach."""
+        return await self.submit(func, *args, reap=reap, on_late=on_late)
+
+    async def _guard(
+        self,
+        fut: asyncio.Future,
+        reap: Optional[Callable[[], None]],
+        on_late: Optional[Callable[[Any], None]],
+        name: str,
+    ) -> Any:
+        try:
+            return await asyncio.wait_for(asyncio.shield(fut), self._deadline)
+        except asyncio.TimeoutError:
+            if reap is not None:
+                self._killed += 1
+                log.warning("Chrome %s exceeded %.0fs; reaping", name, self._deadline)
+                reap()
+            else:
+                self._abandoned += 1
+                log.warning(
+                    "Chrome %s exceeded %.0fs; nothing to reap, left to its thread",
+                    name,
+                    self._deadline,
+                )
+            if on_late is not None:
+                fut.add_done_callback(partial(self._late, on_late, name))
+            raise BrowserTimeout(f"{name} exceeded {self._deadline:.0f}s") from None
+
+    def _late(self, on_late: Callable[[Any], None], name: str, fut: asyncio.Future) -> None:
+        """Hand a result nobody awaits any more to *on_late*."""
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        log.info("Late Chrome %s finished; cleaning up its result", name)
+        try:
+            self._threads.submit(on_late, fut.result())
+        except RuntimeError:  # pool shut down – clean up inline
+            on_late(fut.result())
+
+    def _finished(self, fut: asyncio.Future) -> None:
+        self._running -= 1
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved when the guard already timed out
+
+    def shutdown(self) -> None:
+        """Stop accepting work; threads still blocked are left to die."""
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    # ───────────────────────── metrics ───────────────────────────
+
+    def stats(self) -> Dict[str, float]:
+        """queued = waiting for a driver, running = occupying a thread."""
+        return {
+            "workers": self._workers,
+            "queue_limit": self._max_queue,
+            "queued": self._queued,
+            "running": self._running,
+            "submitted": self._submitted,
+            "killed": self._killed,
+            "abandoned": self._abandoned,
+            "rejected": self._rejected,
+        }
+
+
+browser_executor = BrowserExecutor(
+    settings.browser_pool_size + EXTRA_WORKERS,
+    settings.browser_queue_limit,
+    settings.browser_deadline,
+)
@@ -0,0 +1,98 @@
+"""
+storybot.bot.services.http_session
+──────────────────────────────────
+One application-scoped aiohttp session with a tuned connector, opened in
+the aiogram startup hook and closed on shutdown.
+
+Public
+------
+open_session() / close_session() / get_session() / stats()
+"""
+
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+from typing import Dict
+
+import aiohttp
+
+log = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+    " AppleWebKit/537.36 (KHTML, like Gecko)"
+)
+CONN_LIMIT = 100          # total open sockets
+CONN_LIMIT_PER_HOST = 20  # sockets per (host, port, ssl)
+KEEPALIVE_TIMEOUT = 60    # seconds an idle socket stays in the pool
+DNS_CACHE_TTL = 300       # seconds
+
+
+_session: aiohttp.ClientSession | None = None
+_counters: Dict[str, int] = {"requests": 0, "connections_created": 0, "connections_reused": 0}
+
+
+async def _on_request_end(_s, _ctx, _params: SimpleNamespace) -> None:
+    _counters["requests"] += 1
+
+
+async def _on_connection_create_end(_s, _ctx, _params: SimpleNamespace) -> None:
+    _counters["connections_created"] += 1
+
+
+async def _on_connection_reuseconn(_s, _ctx, _params: SimpleNamespace) -> None:
+    _counters["connections_reused"] += 1
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace = aiohttp.TraceConfig()
+    trace.on_request_end.append(_on_request_end)
+    trace.on_connection_create_end.append(_on_connection_create_end)
+    trace.on_connection_reuseconn.append(_on_connection_reuseconn)
+    return trace
+
+
+async def open_session() -> aiohttp.ClientSession:
+    """Create the shared session (idempotent)."""
+    global _session  # noqa: PLW0603
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONN_LIMIT,
+            limit_per_host=CONN_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            enable_cleanup_closed=True,
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": USER_AGENT},
+            trace_configs=[_trace_config()],
+        )
+        log.info("Shared HTTP session opened")
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared session and its connection pool."""
+    global _session  # noqa: PLW0603
+    if _session is not None and not _session.closed:
+        await _session.close()
+        log.info("Shared HTTP session closed (%s)", stats())
+    _session = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared session, opening it lazily outside the bot runtime."""
+    if _session is None or _session.closed:
+        return await open_session()
+    return _session
+
+
+def stats() -> Dict[str, float]:
+    """Request and connection counters; reuse_ratio is reused / requests."""
+    requests = _counters["requests"]
+    return {
+        **_counters,
+        "reuse_ratio": _counters["connections_reused"] / requests if requests else 0.0,
+    }
@@ -0,0 +1,106 @@
+"""
+storybot.bot.services.media_relay
+─────────────────────────────────
+Fallback for media Telegram cannot fetch by URL itself (expired
+signatures, size, geo blocks): stream it through this process in chunks
+into a bounded spool directory and upload it as a file.
+
+Memory per transfer is one chunk regardless of the media size; disk use
+is capped at ``RELAY_CONCURRENCY × RELAY_MAX_BYTES``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict
+from urllib.parse import urlparse
+
+import aiohttp
+from aiogram.types import FSInputFile
+
+from ..config import settings
+from .http_session import get_session
+from .metrics import span
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024   # bytes read from the CDN per iteration
+RELAY_TIMEOUT = aiohttp.ClientTimeout(total=120, sock_read=30)
+
+SPOOL_DIR = Path(settings.relay_dir or Path(tempfile.gettempdir()) / "storybot-relay")
+
+_slots = asyncio.Semaphore(settings.relay_concurrency)
+_counters: Dict[str, int] = {"active": 0, "relayed": 0, "too_large": 0, "failed": 0, "bytes": 0}
+
+
+class MediaTooLarge(Exception):
+    """The media exceeds RELAY_MAX_BYTES."""
+
+
+def cleanup_spool() -> None:
+    """Remove files left behind by a previous process (call on startup)."""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    for leftover in SPOOL_DIR.iterdir():
+        try:
+            leftover.unlink()
+        except OSError:
+            pass
+
+
+@asynccontextmanager
+async def relay(url: str) -> AsyncIterator[FSInputFile]:
+    """
+    Download *url* to a spool file and yield it as an uploadable InputFile.
+
+    The file is deleted when the block exits.
+
+    Raises
+    ------
+    MediaTooLarge
+        If the declared or streamed size exceeds RELAY_MAX_BYTES.
+    aiohttp.ClientError
+        On download failures.
+    """
+    limit = settings.relay_max_bytes
+    async with _slots:
+        _counters["active"] += 1
+        SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+        suffix = Path(urlparse(url).path).suffix[:8]
+        fd, path = tempfile.mkstemp(dir=SPOOL_DIR, suffix=suffix)
+        try:
+            with span("relay.download"), os.fdopen(fd, "wb") as out:
+                sess = await get_session()
+                async with sess.get(url, timeout=RELAY_TIMEOUT) as r:
+                    r.raise_for_status()
+                    if (r.content_length or 0) > limit:
+                        raise MediaTooLarge(f"{r.content_length} bytes")
+                    size = 0
+                    async for chunk in r.content.iter_chunked(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > limit:
+                            raise MediaTooLarge(f"more than {limit} bytes")
+                        out.write(chunk)
+            _counters["relayed"] += 1
+            _counters["bytes"] += size
+            yield FSInputFile(path, filename=f"story{suffix}")
+        except MediaTooLarge:
+            _counters["too_large"] += 1
+            raise
+        except Exception:
+            _counters["failed"] += 1
+            raise
+        finally:
+            _counters["active"] -= 1
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def stats() -> Dict[str, float]:
+    return dict(_counters)
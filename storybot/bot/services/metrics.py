@@ -0,0 +1,129 @@
+"""
+storybot.bot.services.metrics
+─────────────────────────────
+Tiny metrics registry rendered in the Prometheus text format.
+
+Components keep their own counters and expose them through a ``stats()``
+callable returning ``{name: number}``; register() attaches such a callable
+under a prefix and render() turns everything into ``/metrics`` output.
+
+Latency is recorded with span(): ``with span("api.request"): ...`` feeds
+the ``storybot_stage_seconds{stage=...}`` histogram, from which p50/p95/p99
+per stage come out of ``histogram_quantile`` in Prometheus.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence
+
+log = logging.getLogger(__name__)
+
+NAMESPACE = "storybot"
+
+Collector = Callable[[], Dict[str, float]]
+
+_collectors: Dict[str, Collector] = {}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+ATTEMPT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label value."""
+
+    def __init__(self, name: str, label: str, buckets: Sequence[float]) -> None:
+        self.name = _metric_name(name)
+        self._label = label
+        self._buckets = tuple(buckets)
+        self._series: Dict[str, List[float]] = {}  # counts per bucket + [+Inf]
+        self._sums: Dict[str, float] = {}
+
+    def observe(self, key: str, value: float) -> None:
+        counts = self._series.get(key)
+        if counts is None:
+            counts = self._series[key] = [0] * (len(self._buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._sums[key] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} histogram"]
+        for key, counts in self._series.items():
+            label = f'{self._label}="{key}"'
+            running = 0
+            for bound, n in zip(self._buckets, counts):
+                running += n
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {running}')
+            running += counts[-1]
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {running}')
+            lines.append(f"{self.name}_sum{{{label}}} {self._sums[key]}")
+            lines.append(f"{self.name}_count{{{label}}} {running}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per label value."""
+
+    def __init__(self, name: str, label: str) -> None:
+        self.name = _metric_name(name)
+        self._label = label
+        self._values: Dict[str, float] = {}
+
+    def inc(self, key: str, amount: float = 1) -> None:
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} counter"]
+        for key, value in self._values.items():
+            lines.append(f'{self.name}{{{self._label}="{key}"}} {value}')
+        return lines
+
+
+def _metric_name(*parts: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join((NAMESPACE, *parts)))
+
+
+stage_seconds = Histogram("stage_seconds", "stage", LATENCY_BUCKETS)
+stage_errors = Counter("stage_errors_total", "stage")
+poll_attempts = Histogram("poll_attempts", "outcome", ATTEMPT_BUCKETS)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the enclosed block as *stage*; exceptions are counted and re-raised."""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        stage_errors.inc(stage)
+        raise
+    finally:
+        stage_seconds.observe(stage, time.perf_counter() - started)
+
+
+def register(prefix: str, collector: Collector) -> None:
+    """Expose ``collector()`` as ``storybot_<prefix>_<key>`` gauges."""
+    _collectors[prefix] = collector
+
+
+def render() -> str:
+    """All registered collectors in Prometheus exposition format."""
+    lines: List[str] = []
+    for prefix, collector in _collectors.items():
+        try:
+            values = collector()
+        except Exception as exc:  # noqa: BLE001
+            log.warning("metrics collector %s failed: %s", prefix, exc)
+            continue
+        for key, value in values.items():
+            name = _metric_name(prefix, key)
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {float(value)}")
+    for metric in (stage_seconds, stage_errors, poll_attempts):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
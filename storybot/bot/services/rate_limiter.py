@@ -0,0 +1,96 @@
+"""
+storybot.bot.services.rate_limiter
+──────────────────────────────────
+Async token buckets used to pace outbound Telegram traffic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, Hashable
+
+MAX_IDLE_BUCKETS = 10_000  # prune full buckets above this many keys
+
+
+class TokenBucket:
+    """
+    Classic token bucket: *rate* tokens per second, bursts up to *capacity*.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self._tokens >= self._capacity
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take *tokens* if they are available now.
+
+        Returns 0 on success, otherwise the seconds until they will be; the
+        bucket is left untouched in that case.
+        """
+        tokens = min(tokens, self._capacity)
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self._rate
+
+    async def acquire(self, tokens: float = 1) -> float:
+        """
+        Wait until *tokens* are available; returns seconds waited.
+
+        Requests larger than the capacity are clamped to it, since the bucket
+        could never hold them.
+        """
+        tokens = min(tokens, self._capacity)
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return time.monotonic() - started
+                await asyncio.sleep((tokens - self._tokens) / self._rate)
+
+    def penalize(self, seconds: float) -> None:
+        """Drain the bucket so nothing passes for *seconds* (e.g. retry_after)."""
+        self._refill()
+        self._tokens = min(self._tokens, 0) - seconds * self._rate
+
+
+class KeyedRateLimiter:
+    """One TokenBucket per key (e.g. Telegram chat id), created on demand."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= MAX_IDLE_BUCKETS:
+                self._prune()
+            bucket = self._buckets[key] = TokenBucket(self._rate, self._capacity)
+        return bucket
+
+    async def acquire(self, key: Hashable, tokens: float = 1) -> float:
+        return await self.bucket(key).acquire(tokens)
+
+    def _prune(self) -> None:
+        for key in [k for k, b in self._buckets.items() if b.full]:
+            del self._buckets[key]
@@ -2,37 +2,167 @@
 storybot.bot.services.scheduler
 ───────────────────────────────
 A single AsyncIOScheduler instance plus helpers to (re)schedule
-user-specific background jobs.
+background auto-checks and to rebuild them from MongoDB after a restart.
+
+Two modes (``SCHEDULER_MODE``):
+
+user    one job per Telegram user (``user:<id>``)
+target  one job per followed account and interval (``target:<name>:<h>``)
+        whose result fans out to every subscriber
+
+Only the replica with ``RUN_SCHEDULER`` on runs jobs; on the others the
+schedule_* helpers are no-ops and the scheduler replica picks up settings
+changed there through a periodic resync.
+
+Every job gets a deterministic phase inside its interval derived from its
+id, so jobs are spread evenly no matter when users clicked the button or
+when the process restarted.  Runs go through _guarded_run(), which defers
+(and eventually sheds) background work while the fetch pipeline is
+saturated.
 """
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
-from datetime import timedelta
+import time
+from datetime import datetime, timedelta
+from typing import Dict
 
+from aiogram import Bot
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
+from ..config import settings
+from ..dao.settings_dao import SettingsDAO
+from .browser import driver_pool
+from .send_queue import send_queue
+
 log = logging.getLogger(__name__)
 
+REHYDRATE_BATCH = 1000    # jobs added between event-loop yields
+DEFER_DELAY = 120         # seconds a saturated run is pushed back (× attempt)
+MAX_DEFERRALS = 3         # after this many deferrals the run is shed
+BACKLOG_LIMIT = 500       # queued background sends that count as saturated
+RESYNC_INTERVAL = 600     # seconds between re-reads of auto-check settings
+
 
 scheduler: AsyncIOScheduler = AsyncIOScheduler() 
+_bot: Bot | None = None
+_counters: Dict[str, int] = {"running": 0, "executed": 0, "deferred": 0, "shed": 0}
+
 
+def start_scheduler(bot: Bot) -> None:
+    """
+    Call this inside Aiogram’s startup hook (after event-loop exists).
 
-def start_scheduler() -> None:
-    """Call this inside Aiogram’s startup hook (after event-loop exists)."""
+    *bot* is the application's single Bot instance; jobs reach it through
+    get_bot() instead of opening their own HTTP session per run.
+    """
+    global _bot  # noqa: PLW0603
+    _bot = bot
     if not scheduler.running:
         scheduler.start()
         log.info("APScheduler started")
 
 
 
+def stop_scheduler() -> None:
+    """Stop firing jobs; called from the shutdown hook."""
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+        log.info("APScheduler stopped")
+
+
+def scheduler_alive() -> bool:
+    """False only once the scheduler was started and is no longer running."""
+    return _bot is None or scheduler.running
+
+
+def get_bot() -> Bot:
+    """The Bot injected by start_scheduler()."""
+    if _bot is None:
+        raise RuntimeError("scheduler has no Bot; call start_scheduler(bot) first")
+    return _bot
+
+
+def _phase(key: str, period: float) -> float:
+    """Stable pseudo-random offset in ``[0, period)`` seconds for *key*."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % int(period)
+
+
+def _spread_start(key: str, hours: int) -> datetime:
+    """
+    Next instant on *key*'s own grid ``phase + k·interval`` (epoch-aligned),
+    which puts N jobs of the same interval at evenly spread, reproducible
+    positions instead of wherever they happened to be created.
+    """
+    period = hours * 3600
+    phase = _phase(key, period)
+    now = time.time()
+    k = (now - phase) // period + 1
+    return datetime.fromtimestamp(phase + k * period).astimezone()
+
+
+def _saturated() -> bool:
+    """True while background work should back off."""
+    pool = driver_pool.stats()
+    queue = send_queue.stats()
+    return (
+        _counters["running"] >= settings.job_max_running
+        or pool["waiting"] >= pool["size"]
+        or queue["depth_background"] >= BACKLOG_LIMIT
+    )
+
+
+async def _guarded_run(coroutine_callable, job_id: str, *args, deferrals: int = 0) -> None:
+    """Run a scheduled job unless the pipeline is saturated; then defer or shed."""
+    if _saturated():
+        if deferrals >= MAX_DEFERRALS:
+            _counters["shed"] += 1
+            log.warning("Shedding %s after %s deferrals", job_id, deferrals)
+            return
+        _counters["deferred"] += 1
+        delay = DEFER_DELAY * (deferrals + 1) + _phase(job_id, DEFER_DELAY)
+        scheduler.add_job(
+            _guarded_run,
+            trigger=DateTrigger(run_date=datetime.now().astimezone() + timedelta(seconds=delay)),
+            id=f"{job_id}:deferred",
+            args=[coroutine_callable, job_id, *args],
+            kwargs={"deferrals": deferrals + 1},
+            replace_existing=True,
+            misfire_grace_time=60,
+        )
+        log.info("Deferred %s by %ss (pipeline saturated)", job_id, delay)
+        return
+
+    _counters["running"] += 1
+    try:
+        await coroutine_callable(*args)
+        _counters["executed"] += 1
+    finally:
+        _counters["running"] -= 1
+
+
+def stats() -> Dict[str, float]:
+    """Job counters plus the number of scheduled jobs."""
+    return {**_counters, "jobs": len(scheduler.get_jobs())}
+
+
 def _job_id(user_id: int) -> str:
     """Consistent job id format: user:123456"""
     return f"user:{user_id}"
 
 
-def schedule_user_job(user_id: int, hours: int, coroutine_callable) -> None:
+def schedule_user_job(
+    user_id: int,
+    hours: int,
+    coroutine_callable,
+    first_run: datetime | None = None,
+) -> None:
     """
     Add or replace an interval job for *user_id*.
 
@@ -44,19 +174,25 @@ def schedule_user_job(user_id: int, hours: int, coroutine_callable) -> None:
         Interval in hours between executions.
     coroutine_callable : Coroutine function
         The async function to execute (e.g. fetch_and_push_stories).
+    first_run : datetime, optional
+        When the first execution happens; defaults to the job's spread slot.
     """
+    if not settings.run_scheduler:
+        return
     job_id = _job_id(user_id)
-    trigger = IntervalTrigger(hours=hours)
+    trigger = IntervalTrigger(
+        hours=hours, start_date=first_run or _spread_start(job_id, hours)
+    )
 
     scheduler.add_job(
-        coroutine_callable,
+        _guarded_run,
         trigger=trigger,
         id=job_id,
-        args=[user_id],
+        args=[coroutine_callable, job_id, user_id],
         replace_existing=True,
         misfire_grace_time=60,
     )
-    log.info("Scheduled auto-check for %s every %sh", user_id, hours)
+    log.debug("Scheduled auto-check for %s every %sh", user_id, hours)
 
 
 def remove_user_job(user_id: int) -> None:
@@ -67,3 +203,130 @@ def remove_user_job(user_id: int) -> None:
         log.info("Removed auto-check for %s", user_id)
     except Exception:
         pass
+    try:
+        scheduler.remove_job(f"{job_id}:deferred")
+    except Exception:
+        pass
+
+
+def _target_job_id(username: str, hours: int) -> str:
+    """Consistent job id format: target:natgeo:3"""
+    return f"target:{username}:{hours}"
+
+
+def schedule_target_job(
+    username: str,
+    hours: int,
+    coroutine_callable,
+    first_run: datetime | None = None,
+) -> None:
+    """
+    Make sure an interval job exists for (*username*, *hours*).
+
+    Unlike schedule_user_job an existing job is left untouched, so a new
+    subscriber does not shift the schedule of everyone already following.
+    The job receives ``(username, hours)`` and removes itself once nobody
+    is subscribed any more.
+    """
+    if not settings.run_scheduler:
+        return
+    job_id = _target_job_id(username, hours)
+    if scheduler.get_job(job_id) is not None:
+        return
+
+    trigger = IntervalTrigger(
+        hours=hours, start_date=first_run or _spread_start(job_id, hours)
+    )
+
+    scheduler.add_job(
+        _guarded_run,
+        trigger=trigger,
+        id=job_id,
+        args=[coroutine_callable, job_id, username, hours],
+        replace_existing=True,
+        misfire_grace_time=60,
+    )
+    log.debug("Scheduled target check for @%s every %sh", username, hours)
+
+
+def remove_target_job(username: str, hours: int) -> None:
+    """Delete the target job for (*username*, *hours*) if it exists."""
+    try:
+        scheduler.remove_job(_target_job_id(username, hours))
+        log.info("Removed target check for @%s every %sh", username, hours)
+    except Exception:
+        pass
+
+
+def schedule_resync(rehydrate, coroutine_callable) -> None:
+    """
+    Re-run *rehydrate* every RESYNC_INTERVAL seconds.
+
+    Users who enable auto-check or change their interval on another
+    replica get their job here; jobs of users who disabled it there drop
+    themselves on their next run.
+    """
+    scheduler.add_job(
+        rehydrate,
+        trigger=IntervalTrigger(seconds=RESYNC_INTERVAL),
+        id="resync",
+        args=[coroutine_callable],
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+    )
+
+
+async def rehydrate_jobs(coroutine_callable) -> int:
+    """
+    Re-create interval jobs for every user with ``auto_enabled: true``.
+
+    Settings are streamed through a cursor, so memory stays flat however
+    many users there are, and every job lands on its spread slot so a
+    redeploy does not fire them all at once.  Users whose job already
+    runs at the same interval are left alone, so the periodic resync only
+    touches what changed.  Returns the number of jobs added or replaced.
+    """
+    started = time.monotonic()
+    seen = count = 0
+    async for user_id, hours in SettingsDAO.iter_auto_enabled(REHYDRATE_BATCH):
+        seen += 1
+        if not _job_matches(_job_id(user_id), hours):
+            schedule_user_job(user_id, hours, coroutine_callable)
+            count += 1
+        if seen % REHYDRATE_BATCH == 0:
+            await asyncio.sleep(0)
+
+    log.info(
+        "Rehydrated %s auto-check jobs (%s unchanged) in %.2fs",
+        count,
+        seen - count,
+        time.monotonic() - started,
+    )
+    return count
+
+
+def _job_matches(job_id: str, hours: int) -> bool:
+    job = scheduler.get_job(job_id)
+    return job is not None and getattr(job.trigger, "interval", None) == timedelta(hours=hours)
+
+
+async def rehydrate_target_jobs(coroutine_callable) -> int:
+    """
+    Target-mode counterpart of rehydrate_jobs(): one job per distinct
+    (target_username, interval) among users with auto-check enabled.
+    """
+    started = time.monotonic()
+    count = 0
+    async for username, hours in SettingsDAO.iter_auto_targets():
+        schedule_target_job(username, hours, coroutine_callable)
+        count += 1
+        if count % REHYDRATE_BATCH == 0:
+            await asyncio.sleep(0)
+
+    log.info(
+        "Rehydrated %s target jobs in %.2fs",
+        count,
+        time.monotonic() - started,
+    )
+    return count
@@ -0,0 +1,209 @@
+"""
+storybot.bot.services.send_queue
+────────────────────────────────
+Central outbound queue for Telegram sends.  Every send passes a global and
+a per-chat token bucket, honours ``retry_after`` from 429 responses and
+interactive traffic is served before background auto-checks.  Sends that
+have to wait for their chat (pacing or ``retry_after``) are put back with a
+not-before time instead of holding a worker.
+
+Public
+------
+send_queue.submit(chat_id, factory, priority=Priority.INTERACTIVE)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from ..config import settings
+from .rate_limiter import KeyedRateLimiter, TokenBucket
+
+log = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3          # sends retried after a 429 at most this often
+CHAT_BURST = 3            # messages one chat may receive back-to-back
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+# priority, seq, queued_at, chat_id, weight, factory, future, attempt
+_Job = Tuple[int, int, float, int, int, Callable[[], Awaitable[Any]], asyncio.Future, int]
+
+
+class SendQueue:
+    """
+    Priority queue drained by a fixed set of worker tasks.
+
+    Parameters
+    ----------
+    global_rate : float
+        Messages per second across all chats.
+    chat_rate : float
+        Messages per second to a single chat.
+    workers : int
+        Concurrent senders; a send whose chat is not ready yet is deferred,
+        so a worker only ever waits on the global bucket.
+    """
+
+    def __init__(self, global_rate: float, chat_rate: float, workers: int) -> None:
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats = KeyedRateLimiter(chat_rate, CHAT_BURST)
+        self._n_workers = workers
+        self._queue: asyncio.PriorityQueue | None = None
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+
+        self._depth = {p: 0 for p in Priority}
+        self._deferred = 0
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        self._started = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # ───────────────────────── lifecycle ─────────────────────────
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"tg-send-{i}")
+            for i in range(self._n_workers)
+        ]
+        log.info("Telegram send queue started with %s workers", self._n_workers)
+
+    async def stop(self) -> None:
+        """Drain queued sends, then stop the workers."""
+        if not self._workers:
+            return
+        await self._queue.join()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        log.info("Telegram send queue stopped (%s)", self.stats())
+
+    # ───────────────────────── producer side ─────────────────────
+
+    async def submit(
+        self,
+        chat_id: int,
+        factory: Callable[[], Awaitable[Any]],
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        weight: int = 1,
+    ) -> Any:
+        """
+        Queue ``factory()`` for *chat_id* and wait for its result.
+
+        *weight* is the number of messages the call produces (an album of
+        ten counts as ten against the global limit).
+        """
+        self.start()
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._depth[priority] += 1
+        await self._queue.put(
+            (int(priority), next(self._seq), time.monotonic(), chat_id, weight, factory, fut, 0)
+        )
+        return await fut
+
+    # ───────────────────────── consumer side ─────────────────────
+
+    async def _worker(self) -> None:
+        while True:
+            job: _Job = await self._queue.get()
+            priority, _, queued_at, chat_id, weight, factory, fut, attempt = job
+            self._depth[Priority(priority)] -= 1
+            deferred = False
+            try:
+                if fut.cancelled():
+                    continue
+                delay = self._chats.bucket(chat_id).try_acquire(min(weight, CHAT_BURST))
+                if delay > 0:
+                    deferred = True
+                    self._defer(job, delay)
+                    continue
+                await self._global.acquire(weight)
+
+                if attempt == 0:
+                    waited = time.monotonic() - queued_at
+                    self._started += 1
+                    self._wait_total += waited
+                    self._wait_max = max(self._wait_max, waited)
+
+                try:
+                    result = await factory()
+                except TelegramRetryAfter as exc:
+                    if attempt + 1 >= MAX_ATTEMPTS:
+                        raise
+                    self._retried += 1
+                    log.warning(
+                        "Telegram flood limit for chat %s: retry after %ss",
+                        chat_id, exc.retry_after,
+                    )
+                    self._chats.bucket(chat_id).penalize(exc.retry_after)
+                    deferred = True
+                    self._defer(job[:-1] + (attempt + 1,), exc.retry_after)
+                    continue
+
+                self._sent += 1
+                if not fut.done():
+                    fut.set_result(result)
+            except asyncio.CancelledError:
+                if not fut.done():
+                    fut.cancel()
+                raise
+            except Exception as exc:  # noqa: BLE001
+                self._failed += 1
+                if not fut.done():
+                    fut.set_exception(exc)
+            finally:
+                if not deferred:
+                    self._queue.task_done()
+
+    def _defer(self, job: _Job, delay: float) -> None:
+        """Put *job* back after *delay* seconds, keeping its place in line."""
+        self._deferred += 1
+        asyncio.get_running_loop().call_later(delay, self._requeue, job)
+
+    def _requeue(self, job: _Job) -> None:
+        self._deferred -= 1
+        self._depth[Priority(job[0])] += 1
+        self._queue.put_nowait(job)
+        # settles the get() that deferred it; join() never sees it as done
+        self._queue.task_done()
+
+    # ───────────────────────── metrics ───────────────────────────
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "depth_interactive": self._depth[Priority.INTERACTIVE],
+            "depth_background": self._depth[Priority.BACKGROUND],
+            "deferred": self._deferred,
+            "sent": self._sent,
+            "failed": self._failed,
+            "retried": self._retried,
+            "wait_avg": self._wait_total / self._started if self._started else 0.0,
+            "wait_max": self._wait_max,
+        }
+
+
+# Telegram's global limit is per bot token: replicas split it evenly
+send_queue = SendQueue(
+    global_rate=settings.tg_global_rate / max(settings.tg_replicas, 1),
+    chat_rate=settings.tg_chat_rate,
+    workers=settings.tg_send_workers,
+)
@@ -0,0 +1,62 @@
+"""
+storybot.bot.services.singleflight
+──────────────────────────────────
+Coalesce concurrent calls for the same key into one in-flight coroutine;
+every caller awaits that single run and receives the same result (or
+exception).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Per-key de-duplication of concurrent async work."""
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._leaders = 0
+        self._followers = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+    ) -> T:
+        """
+        Run ``func(*args)`` unless a call for *key* is already running, in
+        which case wait for that one instead.
+
+        Cancelling one caller does not cancel the shared run for the others.
+        """
+        fut = self._inflight.get(key)
+        if fut is None:
+            self._leaders += 1
+            fut = asyncio.ensure_future(func(*args))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._forget(key, f))
+        else:
+            self._followers += 1
+            log.debug("single-flight: joined in-flight call for %s", key)
+        return await asyncio.shield(fut)
+
+    def _forget(self, key: Hashable, fut: asyncio.Future) -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self._leaders,
+            "followers": self._followers,
+        }
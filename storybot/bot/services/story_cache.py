@@ -0,0 +1,108 @@
+"""
+storybot.bot.services.story_cache
+─────────────────────────────────
+TTL + LRU cache of anonstories payloads (``user_info`` and ``stories``)
+keyed by normalised username, with an optional MongoDB second tier.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+from ..dao.story_cache_dao import StoryCacheDAO
+
+log = logging.getLogger(__name__)
+
+
+class StoryCache:
+    """
+    In-process LRU with per-entry expiry.
+
+    Parameters
+    ----------
+    ttl : int
+        Seconds an entry stays valid.
+    maxsize : int
+        Maximum number of usernames kept in memory.
+    use_mongo : bool
+        Also read/write the shared `story_cache` collection.
+    """
+
+    def __init__(self, ttl: int, maxsize: int, use_mongo: bool = False) -> None:
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._use_mongo = use_mongo
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        self._hits = 0
+        self._mongo_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    async def get(self, username: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(username)
+        if entry is not None:
+            expires, data = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(username)
+                self._hits += 1
+                return data
+            del self._entries[username]
+            self._expired += 1
+
+        if self._use_mongo:
+            try:
+                doc = await StoryCacheDAO.get(username)
+            except Exception as exc:  # noqa: BLE001
+                log.warning("story cache: mongo read failed: %s", exc)
+                doc = None
+            if doc is not None:
+                remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+                data = {"user_info": doc["user_info"], "stories": doc["stories"]}
+                self._store(username, data, remaining)
+                self._mongo_hits += 1
+                return data
+
+        self._misses += 1
+        return None
+
+    async def put(self, username: str, data: Dict[str, Any]) -> None:
+        payload = {"user_info": data["user_info"], "stories": data["stories"]}
+        self._store(username, payload, self._ttl)
+        if self._use_mongo:
+            try:
+                await StoryCacheDAO.put(username, payload, self._ttl)
+            except Exception as exc:  # noqa: BLE001
+                log.warning("story cache: mongo write failed: %s", exc)
+
+    def _store(self, username: str, data: Dict[str, Any], ttl: float) -> None:
+        self._entries[username] = (time.monotonic() + ttl, data)
+        self._entries.move_to_end(username)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self._hits + self._mongo_hits + self._misses
+        return {
+            "size": len(self._entries),
+            "hits": self._hits,
+            "mongo_hits": self._mongo_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expired": self._expired,
+            "hit_ratio": (self._hits + self._mongo_hits) / lookups if lookups else 0.0,
+        }
+
+
+story_cache = StoryCache(
+    ttl=settings.story_cache_ttl,
+    maxsize=settings.story_cache_size,
+    use_mongo=settings.story_cache_mongo,
+)
@@ -9,6 +9,7 @@ regular link, it is returned untouched.
 from __future__ import annotations
 
 import base64
+import hashlib
 import logging
 from urllib.parse import urlparse
 
@@ -53,3 +54,14 @@ class URLDecoder:
 
         # Fallback: return whatever we got.
         return url
+
+    @staticmethod
+    def fingerprint(url: str) -> str:
+        """
+        Short stable id for a media URL.
+
+        Only the path is hashed: CDN host and signed query parameters change
+        between fetches of the same story, the file path does not.
+        """
+        path = urlparse(url).path or url
+        return hashlib.blake2b(path.encode(), digest_size=8).hexdigest()
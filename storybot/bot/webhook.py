@@ -0,0 +1,124 @@
+"""
+storybot.bot.webhook
+────────────────────
+Webhook entry point: an aiohttp server that receives Telegram updates,
+validates the secret token and feeds them to the dispatcher.  Several
+replicas can sit behind one load balancer, unlike long polling.
+
+Scaling out: set ``RUN_SCHEDULER=false`` on all replicas but one, so
+auto-checks run once, and ``TG_REPLICAS`` to the replica count, so their
+send queues share Telegram's global rate instead of each using all of it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from typing import Any, Dict, Set, Tuple
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+from .config import settings
+
+log = logging.getLogger(__name__)
+
+SHUTDOWN_TIMEOUT = 30     # seconds in-flight updates get on shutdown
+
+
+class _DrainingRequestHandler(SimpleRequestHandler):
+    """
+    SimpleRequestHandler that answers Telegram at once and handles the
+    update in the background, keeping track of those tasks so shutdown can
+    wait for them.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        task = asyncio.current_task()
+        self._inflight.add(task)
+        try:
+            await super()._background_feed_update(bot, update)
+        finally:
+            self._inflight.discard(task)
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def drain(self, timeout: float) -> int:
+        """Wait up to *timeout* for updates being handled; returns how many are left."""
+        if not self._inflight:
+            return 0
+        _, pending = await asyncio.wait(set(self._inflight), timeout=timeout)
+        return len(pending)
+
+
+async def _register_webhook(bot: Bot) -> None:
+    url = settings.webhook_url.rstrip("/") + settings.webhook_path
+    await bot.set_webhook(
+        url,
+        secret_token=settings.webhook_secret or None,
+        max_connections=min(settings.update_concurrency, 100),
+    )
+    log.info("Webhook registered at %s", url)
+
+
+def build_app(bot: Bot, dp: Dispatcher) -> Tuple[web.Application, _DrainingRequestHandler]:
+    """The aiohttp app serving WEBHOOK_PATH, plus its update handler."""
+    app = web.Application()
+    handler = _DrainingRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=settings.webhook_secret or None,
+    )
+    handler.register(app, path=settings.webhook_path)
+    setup_application(app, dp, bot=bot)
+    return app, handler
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher) -> None:
+    """
+    Serve updates on WEBHOOK_HOST:WEBHOOK_PORT until SIGINT/SIGTERM.
+
+    The dispatcher's startup/shutdown hooks run with the app lifecycle.  On
+    shutdown the listener closes first, then updates still being handled
+    get SHUTDOWN_TIMEOUT seconds to finish before the shutdown hooks run.
+    """
+    if not settings.webhook_url:
+        raise RuntimeError("TG_MODE=webhook requires WEBHOOK_URL")
+    if not settings.webhook_secret:
+        log.warning("WEBHOOK_SECRET is empty; updates are not authenticated")
+
+    dp.startup.register(_register_webhook)
+    app, handler = build_app(bot, dp)
+
+    runner = web.AppRunner(app, shutdown_timeout=SHUTDOWN_TIMEOUT)
+    await runner.setup()
+    site = web.TCPSite(runner, settings.webhook_host, settings.webhook_port)
+    await site.start()
+    log.info(
+        "Webhook server listening on %s:%s%s",
+        settings.webhook_host,
+        settings.webhook_port,
+        settings.webhook_path,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        log.info("Webhook server shutting down (%s updates in flight)", handler.inflight)
+        await site.stop()
+        left = await handler.drain(SHUTDOWN_TIMEOUT)
+        if left:
+            log.warning("%s updates still running after %ss; abandoning them", left, SHUTDOWN_TIMEOUT)
+        await runner.cleanup()
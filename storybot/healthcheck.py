@@ -1,11 +1,104 @@
-from http.server import BaseHTTPRequestHandler, HTTPServer
+"""
+storybot.healthcheck
+────────────────────
+Asyncio-native health endpoints served on the bot's own event loop.
 
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self.send_response(200)
-        self.end_headers()
-        self.wfile.write(b"OK")
+/healthz   liveness  – the loop answers and the scheduler has not died
+/readyz    readiness – Mongo answers, the scheduler runs (on the replica
+                       that has RUN_SCHEDULER on) and the browser / send
+                       pipeline is not saturated
+/metrics   Prometheus text format of every registered collector
+"""
 
-def start_health_server():
-    server = HTTPServer(('0.0.0.0', 8000), HealthCheckHandler)
-    server.serve_forever()
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Dict, Tuple
+
+from aiohttp import web
+
+from storybot.bot.config import settings
+from storybot.bot.dao.settings_dao import _get_client
+from storybot.bot.services import metrics
+from storybot.bot.services.browser import driver_pool
+from storybot.bot.services.scheduler import scheduler, scheduler_alive
+from storybot.bot.services.send_queue import send_queue
+
+log = logging.getLogger(__name__)
+
+MONGO_PING_TIMEOUT = 2    # seconds
+BROWSER_STUCK_AFTER = 120 # seconds all Chrome slots may stay busy with no release
+SEND_BACKLOG_LIMIT = 1000 # queued sends before the replica reports not-ready
+
+
+async def _mongo_ok() -> Tuple[bool, str]:
+    try:
+        await asyncio.wait_for(
+            _get_client().admin.command("ping"), MONGO_PING_TIMEOUT
+        )
+        return True, "ok"
+    except Exception as exc:  # noqa: BLE001
+        return False, f"{type(exc).__name__}: {exc}"
+
+
+def _pipeline_ok() -> Tuple[bool, str]:
+    pool = driver_pool.stats()
+    if pool["in_use"] >= pool["size"] and pool["last_release_age"] > BROWSER_STUCK_AFTER:
+        return False, f"all {pool['size']} Chrome slots busy for {pool['last_release_age']:.0f}s"
+    queue = send_queue.stats()
+    backlog = queue["depth_interactive"] + queue["depth_background"]
+    if backlog > SEND_BACKLOG_LIMIT:
+        return False, f"send backlog {backlog}"
+    return True, "ok"
+
+
+def _reply(ok: bool, checks: Dict[str, str]) -> web.Response:
+    return web.Response(
+        status=200 if ok else 503,
+        text=json.dumps({"ok": ok, "checks": checks}),
+        content_type="application/json",
+    )
+
+
+async def _healthz(_: web.Request) -> web.Response:
+    ok = scheduler_alive()
+    return _reply(ok, {"scheduler": "alive" if ok else "dead"})
+
+
+async def _readyz(_: web.Request) -> web.Response:
+    mongo_ok, mongo_msg = await _mongo_ok()
+    pipe_ok, pipe_msg = _pipeline_ok()
+    if settings.run_scheduler:
+        sched_ok = scheduler.running
+        sched_msg = "running" if sched_ok else "stopped"
+    else:
+        sched_ok, sched_msg = True, "disabled"
+    return _reply(
+        mongo_ok and pipe_ok and sched_ok,
+        {
+            "mongo": mongo_msg,
+            "pipeline": pipe_msg,
+            "scheduler": sched_msg,
+        },
+    )
+
+
+async def _metrics(_: web.Request) -> web.Response:
+    return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_health_server() -> web.AppRunner:
+    """Start the endpoints on HEALTH_PORT; call runner.cleanup() to stop."""
+    app = web.Application()
+    app.router.add_get("/", _healthz)
+    app.router.add_get("/healthz", _healthz)
+    app.router.add_get("/readyz", _readyz)
+    app.router.add_get("/metrics", _metrics)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", settings.health_port).start()
+    log.info("Health endpoints on :%s", settings.health_port)
+    return runner
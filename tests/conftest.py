@@ -0,0 +1,9 @@
+"""
+Shared test setup: the bot's Settings need a token and a DSN at import
+time; the values below are never used to connect anywhere.
+"""
+
+import os
+
+os.environ.setdefault("TG_TOKEN", "123456:TEST")
+os.environ.setdefault("MONGO_DSN", "mongodb://localhost:27017/storybot_test")
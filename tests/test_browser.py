@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from storybot.bot.services.browser import DriverPool, _PooledDriver
+from storybot.bot.services.browser_executor import BrowserExecutor
+
+LAUNCH_SECONDS = 0.2
+
+
+class FakeDriver:
+    current_url = "about:blank"
+
+    def __init__(self):
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakePool(DriverPool):
+    """DriverPool whose launches take LAUNCH_SECONDS and start no browser."""
+
+    def __init__(self, size=1, max_pages=100):
+        super().__init__(size, max_pages, BrowserExecutor(size + 2, 10, 5))
+        self.drivers = []
+
+    def _launch(self):
+        time.sleep(LAUNCH_SECONDS)
+        self.drivers.append(FakeDriver())
+        self._launched += 1
+        return _PooledDriver(self.drivers[-1])
+
+
+async def _lease_forever(pool):
+    async with pool.lease():
+        await asyncio.sleep(60)
+
+
+@pytest.mark.asyncio
+async def test_cancel_during_launch_parks_the_driver():
+    pool = FakePool()
+    task = asyncio.ensure_future(_lease_forever(pool))
+    await asyncio.sleep(LAUNCH_SECONDS / 2)  # inside _launch
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    await asyncio.sleep(LAUNCH_SECONDS)
+    stats = pool.stats()
+    assert stats["launched"] == 1
+    assert stats["idle"] == 1 and stats["in_use"] == 0
+
+    # the parked driver is reused, not leaked and relaunched
+    async with pool.lease() as pooled:
+        assert pooled.driver is pool.drivers[0]
+    assert pool.stats()["launched"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_is_released_when_checkout_fails():
+    pool = FakePool()
+
+    def broken():
+        raise RuntimeError("chrome did not start")
+
+    pool._launch = broken
+    with pytest.raises(RuntimeError):
+        async with pool.lease():
+            pass
+    assert pool.stats()["in_use"] == 0
+    assert not pool._slots.locked()
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+import pytest
+
+from storybot.bot.services.browser_executor import BrowserExecutor, BrowserTimeout
+
+DEADLINE = 0.1
+
+
+@pytest.fixture
+def executor():
+    ex = BrowserExecutor(2, 4, DEADLINE)
+    yield ex
+    ex.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_overrun_with_reap_kills(executor):
+    unblock = threading.Event()
+
+    with pytest.raises(BrowserTimeout):
+        await executor.call(unblock.wait, reap=unblock.set)
+
+    stats = executor.stats()
+    assert unblock.is_set()
+    assert stats["killed"] == 1 and stats["abandoned"] == 0
+
+
+@pytest.mark.asyncio
+async def test_overrun_without_reap_is_abandoned_not_killed(executor):
+    with pytest.raises(BrowserTimeout):
+        await executor.call(threading.Event().wait, 3 * DEADLINE)
+
+    stats = executor.stats()
+    assert stats["killed"] == 0 and stats["abandoned"] == 1
+
+
+@pytest.mark.asyncio
+async def test_late_result_is_handed_to_on_late(executor):
+    cleaned = []
+
+    def slow_launch():
+        threading.Event().wait(2 * DEADLINE)
+        return "driver"
+
+    with pytest.raises(BrowserTimeout):
+        await executor.call(slow_launch, on_late=cleaned.append)
+
+    for _ in range(50):
+        if cleaned:
+            break
+        await asyncio.sleep(DEADLINE / 2)
+    assert cleaned == ["driver"]
+
+
+@pytest.mark.asyncio
+async def test_on_late_is_not_called_on_time(executor):
+    cleaned = []
+    assert await executor.call(lambda: "driver", on_late=cleaned.append) == "driver"
+    await asyncio.sleep(DEADLINE)
+    assert cleaned == []
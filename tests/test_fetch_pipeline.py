@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from storybot.bot.handlers import story
+from storybot.bot.services import api_client, http_session
+from storybot.bot.services.api_client import APIClient
+from storybot.bot.services.auth_token import AuthTokenManager
+from storybot.bot.services.browser import WarmupStrategy
+from storybot.bot.services.story_cache import StoryCache
+
+LOOKUPS = 5
+WARMUP_SECONDS = 0.6      # Chrome rendering the view page after its first request
+READY_AFTER = 0.2         # anonstories builds the JSON this long after the trigger
+POLL_STEP = 0.05
+LEASE_WAIT = 2.0          # longer than the whole poll plan
+READY = {"user_info": {"username": "nasa"}, "stories": [{"source": "https://cdn.example/1.jpg"}]}
+
+
+class FakeAnonstories:
+    """Local stand-in: the story JSON is ready READY_AFTER s after the page hit."""
+
+    def __init__(self):
+        self.triggered_at = None
+
+    async def story(self, request):
+        ready = self.triggered_at is not None and time.monotonic() - self.triggered_at >= READY_AFTER
+        return web.json_response(READY if ready else {})
+
+
+class SlowWarmup(WarmupStrategy):
+    name = "chrome"
+
+    def __init__(self, server):
+        self._server = server
+
+    async def warm_up(self, username, triggered=None):
+        self._server.triggered_at = time.monotonic()
+        if triggered is not None:
+            triggered.set()
+        await asyncio.sleep(WARMUP_SECONDS)
+        return None
+
+
+class QueuedWarmup(SlowWarmup):
+    """Chrome warm-up that first waits LEASE_WAIT s for a busy pool."""
+
+    async def warm_up(self, username, triggered=None):
+        await asyncio.sleep(LEASE_WAIT)
+        return await super().warm_up(username, triggered)
+
+
+class BrokenWarmup(WarmupStrategy):
+    name = "chrome"
+
+    def __init__(self, server):
+        self._server = server
+
+    async def warm_up(self, username, triggered=None):
+        self._server.triggered_at = time.monotonic()
+        raise RuntimeError("chromedriver crashed")
+
+
+@pytest_asyncio.fixture
+async def anonstories(monkeypatch):
+    server = FakeAnonstories()
+    app = web.Application()
+    app.router.add_post("/api/v1/story", server.story)
+    test_server = TestServer(app)
+    await test_server.start_server()
+
+    plan = [i * POLL_STEP for i in range(int(3 * WARMUP_SECONDS / POLL_STEP))]
+    monkeypatch.setattr(api_client, "API_ENDPOINT", str(test_server.make_url("/api/v1/story")))
+    readiness = api_client.ReadinessEstimator()
+    monkeypatch.setattr(readiness, "schedule", lambda: plan)
+    monkeypatch.setattr(api_client, "readiness", readiness)
+    monkeypatch.setattr(story, "story_cache", StoryCache(60, 100))
+    try:
+        yield server
+    finally:
+        await http_session.close_session()
+        await test_server.close()
+
+
+async def _sequential(username):
+    """The pipeline before overlap: warm up, then start polling."""
+    await story.warmup.warm_up(username)
+    return await APIClient().wait_for_stories(AuthTokenManager.build_auth_token(username))
+
+
+async def _time_to_first_story(server, fetch):
+    timings = []
+    for _ in range(LOOKUPS):
+        server.triggered_at = None
+        started = time.perf_counter()
+        assert await fetch("nasa") == READY
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+@pytest.mark.asyncio
+async def test_overlapped_pipeline_cuts_time_to_first_story(monkeypatch, anonstories):
+    monkeypatch.setattr(story, "warmup", SlowWarmup(anonstories))
+
+    before = await _time_to_first_story(anonstories, _sequential)
+    after = await _time_to_first_story(anonstories, story._fetch_stories)
+
+    print(
+        f"time to first story (warm-up {WARMUP_SECONDS}s, ready after {READY_AFTER}s): "
+        f"sequential {before * 1000:.0f} ms, overlapped {after * 1000:.0f} ms"
+    )
+    assert before >= WARMUP_SECONDS
+    assert after < WARMUP_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_failed_warmup_falls_back_to_polling(monkeypatch, anonstories):
+    monkeypatch.setattr(story, "warmup", BrokenWarmup(anonstories))
+    assert await story._fetch_stories("nasa") == READY
+
+
+@pytest.mark.asyncio
+async def test_polling_starts_once_the_warmup_has_a_driver(monkeypatch, anonstories):
+    monkeypatch.setattr(story, "warmup", QueuedWarmup(anonstories))
+    assert LEASE_WAIT > api_client.readiness.schedule()[-1]
+
+    assert await story._fetch_stories("nasa") == READY
+    # the lease wait is not part of anonstories' readiness time
+    assert api_client.readiness.quantile(1.0) < LEASE_WAIT / 2
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from storybot.bot.services import api_client
+from storybot.bot.services.api_client import APIClient, ReadinessEstimator
+
+READY = {"user_info": {"username": "nasa"}, "stories": []}
+
+
+def _trace(n, median, seed):
+    """Recorded-style readiness times: log-normal around *median* seconds."""
+    rng = random.Random(seed)
+    return [median * rng.lognormvariate(0, 0.35) for _ in range(n)]
+
+
+def _replay(est, trace, censor=True):
+    """
+    Run each lookup of *trace* against the estimator's current plan, the way
+    wait_for_stories polls, and feed back what the poller learns.
+    """
+    polls = 0
+    for ready_at in trace:
+        last_miss = 0.0
+        for at in est.schedule():
+            polls += 1
+            if at >= ready_at:
+                if censor:
+                    est.record_between(last_miss, at)
+                else:
+                    est.record(at)  # what the poller used to record
+                break
+            last_miss = at
+    return polls / len(trace)
+
+
+def _learned(median, seed=0):
+    est = ReadinessEstimator()
+    _replay(est, _trace(api_client.MIN_SAMPLES * 10, median, seed))
+    return est
+
+
+def test_fixed_schedule_until_enough_samples():
+    est = ReadinessEstimator()
+    for _ in range(api_client.MIN_SAMPLES - 1):
+        est.record(5.0)
+    assert est.schedule()[:4] == [0.0, 3.0, 6.0, 12.0]
+    est.record(5.0)
+    assert est.schedule()[0] == 5.0
+
+
+def test_plan_is_increasing_and_within_deadline():
+    est = _learned(8.0)
+    plan = est.schedule()
+    assert plan == sorted(set(plan))
+    assert plan[-1] <= est.deadline()
+    assert api_client.MIN_DEADLINE <= est.deadline() <= api_client.MAX_DEADLINE
+
+
+def test_estimate_tracks_a_stationary_trace():
+    est = _learned(8.0)
+    assert 6.0 <= est.quantile(0.5) <= 10.0
+
+
+def test_estimate_follows_anonstories_speeding_up():
+    slow, fast = 12.0, 2.0
+    censored, naive = _learned(slow), _learned(slow)
+    trace = _trace(api_client.READINESS_SAMPLES, fast, seed=1)
+
+    polls = _replay(censored, trace)
+    _replay(naive, trace, censor=False)
+
+    print(
+        f"after speed-up to p50≈{fast}s: censored p50={censored.quantile(0.5):.1f}s "
+        f"({polls:.1f} polls/lookup), at-hit p50={naive.quantile(0.5):.1f}s"
+    )
+    assert censored.quantile(0.5) <= 2 * fast
+    assert naive.quantile(0.5) >= slow / 2  # the old sample could only ratchet up
+
+
+def test_estimate_follows_anonstories_slowing_down():
+    est = _learned(3.0)
+    _replay(est, _trace(500, 10.0, seed=2))
+    assert 8.0 <= est.quantile(0.5) <= 12.0
+
+
+@pytest.mark.asyncio
+async def test_wait_for_stories_records_the_interval_midpoint(monkeypatch):
+    est = ReadinessEstimator()
+    monkeypatch.setattr(est, "schedule", lambda: [0.0, 0.05, 0.1])
+    monkeypatch.setattr(api_client, "readiness", est)
+    answers = iter([{}, {}, READY])
+
+    async def fetch(self, auth_token):
+        return next(answers)
+
+    monkeypatch.setattr(APIClient, "fetch_story_data", fetch)
+
+    assert await APIClient().wait_for_stories("token") == READY
+    assert est.quantile(0.5) == pytest.approx(0.075, abs=0.02)
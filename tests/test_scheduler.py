@@ -0,0 +1,234 @@
+import asyncio
+import gc
+import os
+import time
+from datetime import datetime
+
+import aiohttp
+import pytest
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage, SendPhoto, SendVideo
+from aiogram.types import Chat, Message
+
+from storybot.bot.config import settings
+from storybot.bot.dao.settings_dao import SettingsModel
+from storybot.bot.handlers import story
+from storybot.bot.services import scheduler as scheduler_service
+from storybot.bot.services.send_queue import SendQueue
+
+SOAK_RUNS = 2_000
+SOAK_BATCH = settings.job_max_running  # concurrent runs below the load-shedding limit
+
+PAYLOAD = {
+    "user_info": {
+        "username": "nasa", "full_name": "NASA", "posts": 1, "followers": 2, "following": 3,
+    },
+    "stories": [{"source": "https://cdn.example/s/1.jpg", "media_type": "image"}],
+}
+
+
+class FakeSession(BaseSession):
+    """Answers every Bot API call locally, counting them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests = 0
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests += 1
+        if isinstance(method, (SendMessage, SendPhoto, SendVideo)):
+            return Message(
+                message_id=self.requests,
+                date=datetime.now(),
+                chat=Chat(id=method.chat_id, type="private"),
+            ).as_(bot)
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def _open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def _live(kind) -> int:
+    gc.collect()
+    return sum(isinstance(obj, kind) for obj in gc.get_objects())
+
+
+@pytest.fixture
+def offline_story(monkeypatch):
+    """fetch_and_push_stories with Mongo and anonstories replaced by stubs."""
+
+    async def get(user_id):
+        return SettingsModel(user_id=user_id, auto_enabled=True, target_username="nasa")
+
+    async def lookup(username):
+        return PAYLOAD
+
+    async def nothing_seen(user_id, target, fps):
+        return set()
+
+    async def noop(*args, **kwargs):
+        return None
+
+    async def no_file_ids(fps):
+        return {}
+
+    monkeypatch.setattr(story.SettingsDAO, "get", get)
+    monkeypatch.setattr(story, "_lookup", lookup)
+    monkeypatch.setattr(story.DeliveryDAO, "delivered", nothing_seen)
+    monkeypatch.setattr(story.DeliveryDAO, "mark", noop)
+    monkeypatch.setattr(story.SearchDAO, "add", noop)
+    monkeypatch.setattr(story.MediaCacheDAO, "get_many", no_file_ids)
+    monkeypatch.setattr(story.MediaCacheDAO, "put_many", noop)
+    monkeypatch.setattr(story, "send_queue", SendQueue(1e6, 1e6, 16))
+    return story
+
+
+@pytest.mark.asyncio
+async def test_scheduled_jobs_reuse_one_bot_soak(offline_story):
+    session = FakeSession()
+    bot = Bot(token="123456:TEST", session=session)
+    scheduler_service.start_scheduler(bot)
+    try:
+        async def run(uid):
+            await scheduler_service._guarded_run(
+                offline_story.fetch_and_push_stories, f"user:{uid}", uid
+            )
+
+        await asyncio.gather(*(run(uid) for uid in range(SOAK_BATCH)))  # warm-up
+        fds, bots = _open_fds(), _live(Bot)
+        sessions, http = _live(BaseSession), _live(aiohttp.ClientSession)
+
+        for start in range(0, SOAK_RUNS, SOAK_BATCH):
+            await asyncio.gather(*(run(uid) for uid in range(start, start + SOAK_BATCH)))
+
+        assert scheduler_service.stats()["executed"] >= SOAK_RUNS
+        assert session.requests >= SOAK_RUNS * 3
+        assert _open_fds() <= fds + 2
+        assert _live(Bot) == bots
+        assert _live(BaseSession) == sessions
+        assert _live(aiohttp.ClientSession) == http
+    finally:
+        scheduler_service.stop_scheduler()
+        await offline_story.send_queue.stop()
+
+
+# ───────────────────────── spreading ─────────────────────────
+
+SYNTHETIC_USERS = 10_000
+INTERVAL_HOURS = 3
+JOB_SECONDS = 60          # how long one auto-check occupies the pipeline
+
+
+def _peak_concurrency(starts, duration=JOB_SECONDS):
+    """Largest number of runs overlapping at any instant."""
+    events = sorted([(t, 1) for t in starts] + [(t + duration, -1) for t in starts])
+    peak = current = 0
+    for _, delta in events:
+        current += delta
+        peak = max(peak, current)
+    return peak
+
+
+def _first_runs(created_at, spread):
+    period = INTERVAL_HOURS * 3600
+    runs = []
+    for uid, created in enumerate(created_at):
+        if spread:
+            runs.append(scheduler_service._spread_start(f"user:{uid}", INTERVAL_HOURS).timestamp())
+        else:
+            runs.append(created + period)  # IntervalTrigger counting from the click
+    return runs
+
+
+def test_phase_is_stable_and_inside_the_period():
+    period = INTERVAL_HOURS * 3600
+    phases = [scheduler_service._phase(f"user:{uid}", period) for uid in range(1_000)]
+    assert phases == [scheduler_service._phase(f"user:{uid}", period) for uid in range(1_000)]
+    assert all(0 <= p < period for p in phases)
+
+
+@pytest.mark.parametrize("burst_seconds", [0, 600])
+def test_spreading_cuts_peak_concurrency_for_10k_users(burst_seconds):
+    """Users enabling auto-check within *burst_seconds* (0 = redeploy)."""
+    now = time.time()
+    created_at = [now + burst_seconds * uid / SYNTHETIC_USERS for uid in range(SYNTHETIC_USERS)]
+
+    naive = _peak_concurrency(_first_runs(created_at, spread=False))
+    spread = _peak_concurrency(_first_runs(created_at, spread=True))
+
+    uniform = SYNTHETIC_USERS * JOB_SECONDS / (INTERVAL_HOURS * 3600)
+    print(f"burst={burst_seconds}s peak naive={naive} spread={spread} uniform≈{uniform:.0f}")
+    assert spread <= 2 * uniform
+    assert spread * 10 <= naive
+
+
+@pytest.mark.asyncio
+async def test_saturated_runs_are_deferred_then_shed(monkeypatch):
+    calls = []
+
+    async def job(uid):
+        calls.append(uid)
+
+    monkeypatch.setattr(scheduler_service, "_saturated", lambda: True)
+    before = dict(scheduler_service._counters)
+
+    await scheduler_service._guarded_run(job, "user:42", 42)
+    assert scheduler_service.scheduler.get_job("user:42:deferred") is not None
+
+    await scheduler_service._guarded_run(
+        job, "user:42", 42, deferrals=scheduler_service.MAX_DEFERRALS
+    )
+    scheduler_service.remove_user_job(42)
+
+    assert calls == []
+    assert scheduler_service._counters["deferred"] == before["deferred"] + 1
+    assert scheduler_service._counters["shed"] == before["shed"] + 1
+
+
+# ───────────────────────── resync ─────────────────────────
+
+RESYNC_USERS = 10_000
+
+
+@pytest.mark.asyncio
+async def test_resync_only_touches_changed_jobs(monkeypatch):
+    intervals = {uid: 3 for uid in range(RESYNC_USERS)}
+
+    async def iter_auto_enabled(batch_size=1000):
+        for item in list(intervals.items()):
+            yield item
+
+    async def job(uid):
+        pass
+
+    monkeypatch.setattr(scheduler_service.SettingsDAO, "iter_auto_enabled", iter_auto_enabled)
+    scheduler_service.start_scheduler(Bot(token="123456:TEST", session=FakeSession()))
+    try:
+        started = time.perf_counter()
+        assert await scheduler_service.rehydrate_jobs(job) == RESYNC_USERS
+        first = time.perf_counter() - started
+
+        untouched = scheduler_service.scheduler.get_job("user:0").next_run_time
+        intervals[1] = 6
+        intervals[RESYNC_USERS] = 3
+
+        started = time.perf_counter()
+        assert await scheduler_service.rehydrate_jobs(job) == 2
+        resync = time.perf_counter() - started
+
+        print(f"{RESYNC_USERS} users: first rehydrate {first:.2f}s, resync {resync:.2f}s")
+        assert scheduler_service.scheduler.get_job("user:0").next_run_time == untouched
+        assert scheduler_service.scheduler.get_job("user:1").trigger.interval.total_seconds() == 6 * 3600
+        assert scheduler_service.scheduler.get_job(f"user:{RESYNC_USERS}") is not None
+        assert resync < first
+    finally:
+        scheduler_service.scheduler.remove_all_jobs()
+        scheduler_service.stop_scheduler()
@@ -0,0 +1,94 @@
+import asyncio
+import importlib
+import os
+import time
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+
+from storybot.bot.dao import settings_dao
+from storybot.bot.dao.schema import INDEXES
+
+# collections whose documents carry `expires_at` and rely on a TTL index
+TTL_COLLECTIONS = {
+    "story_cache": "storybot.bot.dao.story_cache_dao",
+    "deliveries": "storybot.bot.dao.delivery_dao",
+}
+
+
+@pytest.fixture
+def motor_client(monkeypatch):
+    """An unconnected client; `_get_client` would block resolving its address."""
+    client = AsyncIOMotorClient(os.environ["MONGO_DSN"], connect=False)
+    monkeypatch.setattr(settings_dao, "_motor", client)
+    yield client
+    client.close()
+
+
+def _ttl_fields(coll_name):
+    return {
+        tuple(model.document["key"])
+        for model in INDEXES.get(coll_name, [])
+        if model.document.get("expireAfterSeconds") == 0
+    }
+
+
+@pytest.mark.parametrize("coll_name", sorted(TTL_COLLECTIONS))
+def test_ttl_index_is_part_of_the_bootstrap(coll_name):
+    assert ("expires_at",) in _ttl_fields(coll_name)
+
+
+@pytest.mark.parametrize("coll_name,module", sorted(TTL_COLLECTIONS.items()))
+def test_dao_access_does_not_create_indexes(monkeypatch, motor_client, coll_name, module):
+    calls = []
+    monkeypatch.setattr(
+        AsyncIOMotorCollection, "create_index", lambda self, *a, **kw: calls.append(a)
+    )
+    dao = importlib.import_module(module)
+    for _ in range(3):
+        assert dao._get_collection().name == coll_name
+    assert calls == []
+
+
+# ───────────────────── per-call overhead (old guard vs bootstrap) ─────────────────────
+
+CALLS = 20                # each legacy call leaves a command to fail server selection
+
+
+def _legacy_get_collection(db, issued):
+    """The pre-bootstrap helper: the guard sits on a throw-away object."""
+    coll = db.settings
+    if not hasattr(coll, "_index_created"):
+        issued.append(coll.create_index("target_username", sparse=True))
+        setattr(coll, "_index_created", True)
+    return coll
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_removes_the_per_call_index_command(monkeypatch):
+    client = AsyncIOMotorClient(
+        os.environ["MONGO_DSN"], connect=False, serverSelectionTimeoutMS=50
+    )
+    monkeypatch.setattr(settings_dao, "_motor", client)
+    db = client.get_default_database()
+    issued = []
+
+    started = time.perf_counter()
+    for _ in range(CALLS):
+        _legacy_get_collection(db, issued)
+    legacy = (time.perf_counter() - started) / CALLS
+
+    started = time.perf_counter()
+    for _ in range(CALLS):
+        settings_dao._get_collection()
+    current = (time.perf_counter() - started) / CALLS
+
+    # nobody reachable here: the commands fail server selection quickly
+    await asyncio.gather(*issued, return_exceptions=True)
+    client.close()
+
+    print(
+        f"per call: legacy {legacy * 1e6:.1f} µs + 1 createIndexes round-trip, "
+        f"bootstrap {current * 1e6:.1f} µs + none"
+    )
+    assert len(issued) == CALLS  # the guard never stuck
@@ -0,0 +1,92 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+from storybot.bot.dao import search_dao
+
+
+class FakeCollection:
+    """The handful of Motor calls migrate_from_settings makes, in memory."""
+
+    def __init__(self, docs=()):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+        self.finds = 0
+        self.fail_next_update = False
+
+    def find(self, query, projection=None, batch_size=None):
+        self.finds += 1
+        field = next(iter(query))
+        matches = [dict(d) for d in self.docs.values() if field in d]
+
+        async def _iter():
+            for doc in matches:
+                yield doc
+
+        return _iter()
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for idx, doc in enumerate(docs):
+            if doc["_id"] in self.docs:
+                errors.append({"index": idx, "code": 11000})
+            else:
+                self.docs[doc["_id"]] = dict(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def update_many(self, query, update):
+        if self.fail_next_update:
+            self.fail_next_update = False
+            raise ConnectionError("crash between insert and $unset")
+        for _id in query["_id"]["$in"]:
+            for field in update["$unset"]:
+                self.docs[_id].pop(field, None)
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+
+@pytest.fixture
+def collections(monkeypatch):
+    settings = FakeCollection(
+        [
+            {"_id": 1, "searches": [{"username": "a"}, {"username": "b"}]},
+            {"_id": 2, "searches": [{"username": "c"}]},
+            {"_id": 3},
+        ]
+    )
+    searches, migrations = FakeCollection(), FakeCollection()
+    monkeypatch.setattr(search_dao, "_get_settings", lambda: settings)
+    monkeypatch.setattr(search_dao, "_get_collection", lambda: searches)
+    monkeypatch.setattr(search_dao, "_get_migrations", lambda: migrations)
+    return settings, searches, migrations
+
+
+@pytest.mark.asyncio
+async def test_migration_moves_events_and_records_completion(collections):
+    settings, searches, migrations = collections
+
+    assert await search_dao.SearchDAO.migrate_from_settings() == 3
+    assert sorted(d["username"] for d in searches.docs.values()) == ["a", "b", "c"]
+    assert all("searches" not in d for d in settings.docs.values())
+    assert search_dao.MIGRATION_ID in migrations.docs
+
+    assert await search_dao.SearchDAO.migrate_from_settings() == 0
+    assert settings.finds == 1  # marker found: no second scan
+
+
+@pytest.mark.asyncio
+async def test_crash_before_unset_does_not_duplicate_events(collections):
+    settings, searches, migrations = collections
+    settings.fail_next_update = True
+
+    with pytest.raises(ConnectionError):
+        await search_dao.SearchDAO.migrate_from_settings()
+    assert len(searches.docs) == 3
+    assert not migrations.docs
+
+    await search_dao.SearchDAO.migrate_from_settings()
+    assert len(searches.docs) == 3
+    assert all("searches" not in d for d in settings.docs.values())
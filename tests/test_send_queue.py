@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+
+from storybot.bot.services.rate_limiter import TokenBucket
+from storybot.bot.services.send_queue import Priority, SendQueue
+
+
+def _flood(seconds):
+    return TelegramRetryAfter(
+        method=SendMessage(chat_id=1, text="x"), message="Too Many Requests", retry_after=seconds
+    )
+
+
+@pytest.mark.asyncio
+async def test_acquire_larger_than_capacity_is_clamped():
+    bucket = TokenBucket(rate=5, capacity=5)
+    await asyncio.wait_for(bucket.acquire(10), timeout=1)
+    assert bucket.try_acquire(1) > 0
+
+
+@pytest.mark.asyncio
+async def test_album_passes_a_small_global_bucket():
+    queue = SendQueue(global_rate=3, chat_rate=10, workers=1)
+
+    async def album():
+        return "sent"
+
+    assert await asyncio.wait_for(queue.submit(1, album, weight=10), timeout=2) == "sent"
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_retry_after_does_not_hold_workers():
+    queue = SendQueue(global_rate=100, chat_rate=100, workers=1)
+    calls = {"background": 0}
+
+    async def background():
+        calls["background"] += 1
+        if calls["background"] == 1:
+            raise _flood(1)
+        return "late"
+
+    async def interactive():
+        return "now"
+
+    slow = asyncio.ensure_future(queue.submit(1, background, priority=Priority.BACKGROUND))
+    await asyncio.sleep(0.05)
+
+    started = time.monotonic()
+    assert await queue.submit(2, interactive) == "now"
+    assert time.monotonic() - started < 0.5
+    assert not slow.done()
+    assert queue.stats()["deferred"] == 1
+
+    assert await asyncio.wait_for(slow, timeout=3) == "late"
+    assert queue.stats()["retried"] == 1
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_deferred_sends():
+    queue = SendQueue(global_rate=100, chat_rate=100, workers=2)
+    seen = []
+
+    async def flaky():
+        seen.append(time.monotonic())
+        if len(seen) == 1:
+            raise _flood(0.2)
+        return "ok"
+
+    fut = asyncio.ensure_future(queue.submit(7, flaky, priority=Priority.BACKGROUND))
+    await asyncio.sleep(0.05)
+    await queue.stop()
+    assert fut.done() and fut.result() == "ok"
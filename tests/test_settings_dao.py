@@ -0,0 +1,116 @@
+import asyncio
+import time
+from datetime import datetime
+
+import bson
+import pytest
+
+from storybot.bot.dao import settings_dao
+from storybot.bot.dao.settings_dao import _PROJECTION, SettingsModel
+
+HISTORY = 10_000          # embedded search records of a heavy legacy user
+READS = 50
+
+
+def _settings_doc(history):
+    return {
+        "_id": 42,
+        "auto_enabled": True,
+        "interval": 3,
+        "target_username": "nasa",
+        "searches": [
+            {"username": f"user{i}", "ts": datetime(2024, 1, 1), "sent": 3} for i in range(history)
+        ],
+    }
+
+
+def _read_latency(raw: bytes) -> float:
+    """Seconds per read spent decoding the reply and validating the model."""
+    started = time.perf_counter()
+    for _ in range(READS):
+        SettingsModel.model_validate(bson.decode(raw))
+    return (time.perf_counter() - started) / READS
+
+
+@pytest.mark.parametrize("history", [100, HISTORY])
+def test_projected_read_is_independent_of_history(history):
+    doc = _settings_doc(history)
+    before = bson.encode(doc)  # old get(): whole document incl. `searches`
+    after = bson.encode({k: v for k, v in doc.items() if k in _PROJECTION})
+
+    slow, fast = _read_latency(before), _read_latency(after)
+    print(
+        f"history={history}: {len(before)} B / {slow * 1e6:.0f} µs before, "
+        f"{len(after)} B / {fast * 1e6:.0f} µs after"
+    )
+    assert SettingsModel.model_validate(bson.decode(after)).target_username == "nasa"
+    assert len(after) < 100
+    if history == HISTORY:
+        assert fast * 20 < slow
+
+
+# ───────────────────────── read-through cache ─────────────────────────
+
+
+class SlowCollection:
+    """find_one replies only when released, after an update got through."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.release = asyncio.Event()
+
+    async def find_one(self, query, projection=None):
+        reply = dict(self.doc)
+        await self.release.wait()
+        return reply
+
+    async def find_one_and_update(self, query, update, **kw):
+        self.doc.update(update["$set"])
+        return dict(self.doc)
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = settings_dao._SettingsCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(settings_dao, "_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_late_read_does_not_overwrite_a_newer_update(monkeypatch, fresh_cache):
+    coll = SlowCollection({"_id": 7, "auto_enabled": False, "interval": 3})
+    monkeypatch.setattr(settings_dao, "_get_collection", lambda: coll)
+
+    reader = asyncio.ensure_future(settings_dao.SettingsDAO.get(7))
+    await asyncio.sleep(0)
+    await settings_dao.SettingsDAO.update(7, auto_enabled=True)
+    coll.release.set()
+
+    assert (await reader).auto_enabled is False  # the caller still gets its reply
+    assert (await settings_dao.SettingsDAO.get(7)).auto_enabled is True
+    assert fresh_cache.stats()["stale_skips"] == 1
+
+
+@pytest.mark.asyncio
+async def test_read_without_concurrent_write_is_cached(monkeypatch, fresh_cache):
+    coll = SlowCollection({"_id": 8, "auto_enabled": True, "interval": 6})
+    coll.release.set()
+    monkeypatch.setattr(settings_dao, "_get_collection", lambda: coll)
+
+    await settings_dao.SettingsDAO.get(8)
+    await settings_dao.SettingsDAO.get(8)
+    assert fresh_cache.stats()["hits"] == 1
+    assert not fresh_cache._readers and not fresh_cache._written
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(settings_dao.time, "monotonic", lambda: now[0])
+    cache = settings_dao._SettingsCache(maxsize=10, ttl=30)
+
+    cache.put(SettingsModel(user_id=1, auto_enabled=True))
+    now[0] += 29
+    assert cache.get(1).auto_enabled is True
+    now[0] += 2
+    assert cache.get(1) is None
+    assert cache.stats()["expired"] == 1
@@ -0,0 +1,147 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from storybot.bot.handlers import story
+from storybot.bot.services.send_queue import Priority, SendQueue
+from storybot.bot.services.url_decoder import URLDecoder
+
+
+@pytest.fixture
+def subscribers(monkeypatch):
+    async def iter_subscribers(username, hours):
+        for uid in range(100):
+            yield uid
+
+    monkeypatch.setattr(story.SettingsDAO, "iter_subscribers", iter_subscribers)
+
+
+@pytest.mark.asyncio
+async def test_failed_target_fetch_is_not_repeated_per_subscriber(monkeypatch, subscribers):
+    lookups, pushes = [], []
+
+    async def lookup(username):
+        lookups.append(username)
+        return None
+
+    async def push(uid, username, data=None):
+        pushes.append(uid)
+
+    monkeypatch.setattr(story, "_lookup", lookup)
+    monkeypatch.setattr(story, "_push_to_user", push)
+
+    await story.fetch_and_push_target("nasa", 3)
+    assert lookups == ["nasa"]
+    assert pushes == []
+
+
+@pytest.mark.asyncio
+async def test_target_fetch_fans_out_once(monkeypatch, subscribers):
+    lookups, pushes = [], []
+    payload = {"user_info": {}, "stories": []}
+
+    async def lookup(username):
+        lookups.append(username)
+        return payload
+
+    async def push(uid, username, data=None):
+        assert data is payload
+        pushes.append(uid)
+
+    monkeypatch.setattr(story, "_lookup", lookup)
+    monkeypatch.setattr(story, "_push_to_user", push)
+
+    await story.fetch_and_push_target("nasa", 3)
+    assert lookups == ["nasa"]
+    assert sorted(pushes) == list(range(100))
+
+
+class FakeChat:
+    """Requester whose sends fail for media URLs containing "broken"."""
+
+    def __init__(self):
+        self.chat = self.from_user = SimpleNamespace(id=7)
+        self.sent = []
+
+    async def answer_photo(self, ref, caption=None):
+        if "broken" in str(ref):
+            raise RuntimeError("Bad Request: wrong file identifier")
+        self.sent.append(ref)
+        return SimpleNamespace(photo=None, video=None)
+
+    answer_video = answer_photo
+
+    async def answer_media_group(self, media):
+        raise RuntimeError("Bad Request: group send failed")
+
+
+@pytest.fixture
+def failing_sends(monkeypatch):
+    @asynccontextmanager
+    async def relay(url):
+        raise RuntimeError("relay download failed")
+        yield
+
+    async def no_file_ids(fps):
+        return {}
+
+    async def noop(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(story, "relay", relay)
+    monkeypatch.setattr(story.MediaCacheDAO, "get_many", no_file_ids)
+    monkeypatch.setattr(story.MediaCacheDAO, "put_many", noop)
+    monkeypatch.setattr(story, "send_queue", SendQueue(1e6, 1e6, 16))
+
+
+STORIES = [
+    {"source": "https://cdn.example/s/1.jpg", "media_type": "image"},
+    {"source": "https://cdn.example/s/broken.jpg", "media_type": "image"},
+    {"source": "https://cdn.example/s/3.mp4", "media_type": "video"},
+]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("delivery", ["single", "album"])
+async def test_only_sent_stories_are_reported(monkeypatch, failing_sends, delivery):
+    monkeypatch.setattr(story.settings, "story_delivery", delivery)
+    chat = FakeChat()
+    try:
+        delivered = await story._send_stories(chat, STORIES, Priority.BACKGROUND)
+    finally:
+        await story.send_queue.stop()
+
+    assert delivered == [_fp(STORIES[0]), _fp(STORIES[2])]
+    assert len(chat.sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_stories_stay_undelivered(monkeypatch):
+    marked, status = [], SimpleNamespace(edit_text=_noop, delete=_noop)
+
+    async def send_stories(msg, stories, priority):
+        return [_fp(STORIES[0])]
+
+    async def mark(user_id, target, fps):
+        marked.extend(fps)
+
+    async def profile(*args):
+        pass
+
+    monkeypatch.setattr(story, "_send_stories", send_stories)
+    monkeypatch.setattr(story, "_send_profile_info", profile)
+    monkeypatch.setattr(story.DeliveryDAO, "mark", mark)
+    monkeypatch.setattr(story.SearchDAO, "add", _noop)
+
+    data = {"user_info": {}, "stories": STORIES}
+    assert await story._process_username(FakeChat(), status, "nasa", data=data)
+    assert marked == [_fp(STORIES[0])]
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def _fp(st):
+    return URLDecoder.fingerprint(URLDecoder.decode_embed_url(st["source"]))
@@ -0,0 +1,106 @@
+import pytest
+
+from storybot.bot.services.browser import HTTP_MISS_LIMIT, AutoWarmup, HttpWarmup, WarmupStrategy
+
+
+class FakeHttp(HttpWarmup):
+    def __init__(self, answer):
+        super().__init__()
+        self.answer = answer
+
+    async def trigger(self, username, triggered=None):
+        return self.answer
+
+
+class FakeChrome(WarmupStrategy):
+    name = "chrome"
+
+    def __init__(self):
+        self.runs = []
+
+    async def warm_up(self, username, triggered=None):
+        self.runs.append(username)
+        return None
+
+
+READY = {"user_info": {"username": "a"}, "stories": []}
+MISSING = {"_http_status": 404}
+PRIVATE = {"user_info": {"username": "a", "is_private": True}}
+
+
+@pytest.mark.asyncio
+async def test_completed_http_trigger_skips_chrome():
+    chrome = FakeChrome()
+    auto = AutoWarmup(FakeHttp({}), chrome)
+
+    assert await auto.warm_up("a") is None
+    assert await auto.followup("a", "ready") is False
+    assert chrome.runs == []
+    assert auto.stats()["http_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ready_http_answer_is_returned():
+    auto = AutoWarmup(FakeHttp(READY), FakeChrome())
+    assert await auto.warm_up("a") == READY
+
+
+@pytest.mark.asyncio
+async def test_empty_poll_after_http_falls_back_to_chrome_once():
+    chrome = FakeChrome()
+    auto = AutoWarmup(FakeHttp({}), chrome)
+
+    await auto.warm_up("a")
+    assert await auto.followup("a", "exhausted") is True
+    assert chrome.runs == ["a"]
+    # the Chrome round is not followed up again
+    assert await auto.followup("a", "exhausted") is False
+
+
+@pytest.mark.asyncio
+async def test_failed_page_fetch_goes_straight_to_chrome():
+    chrome = FakeChrome()
+    auto = AutoWarmup(FakeHttp(None), chrome)
+
+    assert await auto.warm_up("a") is None
+    assert chrome.runs == ["a"]
+    assert await auto.followup("a", "exhausted") is False
+
+
+@pytest.mark.asyncio
+async def test_repeated_misses_switch_to_chrome_first():
+    chrome = FakeChrome()
+    auto = AutoWarmup(FakeHttp(None), chrome)
+
+    for i in range(HTTP_MISS_LIMIT):
+        await auto.warm_up(f"u{i}")
+    assert auto.stats()["http_disabled"] == 1
+
+    auto._http.answer = READY
+    assert await auto.warm_up("next") is None
+    assert chrome.runs[-1] == "next"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("answer", [MISSING, PRIVATE])
+async def test_gone_accounts_never_escalate(answer):
+    chrome = FakeChrome()
+    auto = AutoWarmup(FakeHttp(answer), chrome)
+
+    for i in range(2 * HTTP_MISS_LIMIT):
+        assert await auto.warm_up(f"gone{i}") is None
+        assert await auto.followup(f"gone{i}", "gone") is False
+
+    stats = auto.stats()
+    assert chrome.runs == []
+    assert stats["http_misses"] == 0 and stats["http_disabled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_poll_finding_the_account_gone_does_not_escalate():
+    chrome = FakeChrome()
+    auto = AutoWarmup(FakeHttp({}), chrome)
+
+    await auto.warm_up("a")
+    assert await auto.followup("a", "gone") is False
+    assert chrome.runs == []
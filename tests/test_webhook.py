@@ -0,0 +1,197 @@
+import asyncio
+import json
+import time
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import GetMe, GetUpdates
+from aiogram.types import Message, Update, User
+from aiohttp.test_utils import TestClient, TestServer
+
+from storybot import healthcheck
+from storybot.bot import webhook
+from storybot.bot.config import settings
+from storybot.bot.main import _ConcurrencyLimit
+from storybot.bot.services import scheduler as scheduler_service
+
+SECRET = "s3cret"
+UPDATES = 1_000
+HANDLER_SECONDS = 0.05    # time one update spends in a handler
+TELEGRAM_RTT = 0.05       # emulated round-trip to the Bot API
+WEBHOOK_CONNECTIONS = 40  # Telegram's default max_connections
+
+
+def _update(i):
+    return {
+        "update_id": i,
+        "message": {
+            "message_id": i,
+            "date": 0,
+            "chat": {"id": 1, "type": "private"},
+            "text": "hi",
+        },
+    }
+
+
+class FakeTelegram(BaseSession):
+    """Bot API stand-in serving a fixed backlog of updates to getUpdates."""
+
+    def __init__(self, total=0, rtt=0.0):
+        super().__init__()
+        self._updates = [Update.model_validate(_update(i)) for i in range(1, total + 1)]
+        self._rtt = rtt
+
+    async def make_request(self, bot, method, timeout=None):
+        await asyncio.sleep(self._rtt)
+        if isinstance(method, GetUpdates):
+            offset = method.offset or 0
+            return [u for u in self._updates if u.update_id >= offset][: method.limit or 100]
+        if isinstance(method, GetMe):
+            return User(id=1, is_bot=True, first_name="bot", username="bot")
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def _dispatcher(handled, delay=HANDLER_SECONDS):
+    router = Router()
+
+    @router.message()
+    async def on_message(msg: Message) -> None:
+        await asyncio.sleep(delay)
+        handled.append(msg.message_id)
+
+    dp = Dispatcher()
+    dp.update.outer_middleware(_ConcurrencyLimit(settings.update_concurrency))
+    dp.include_router(router)
+    return dp
+
+
+@pytest.fixture
+def webhook_client(monkeypatch):
+    """Factory for a test client in front of build_app(); callers close it."""
+    monkeypatch.setattr(settings, "webhook_secret", SECRET)
+
+    async def make(dp):
+        bot = Bot(token="123456:TEST", session=FakeTelegram())
+        app, handler = webhook.build_app(bot, dp)
+        client = TestClient(TestServer(app))
+        await client.start_server()
+        return client, handler
+
+    return make
+
+
+async def _post(client, i, secret=SECRET):
+    return await client.post(
+        settings.webhook_path,
+        json=_update(i),
+        headers={"X-Telegram-Bot-Api-Secret-Token": secret},
+    )
+
+
+@pytest.mark.asyncio
+async def test_wrong_secret_is_rejected(webhook_client):
+    handled = []
+    client, handler = await webhook_client(_dispatcher(handled, delay=0))
+    try:
+        assert (await _post(client, 1, secret="nope")).status == 401
+        assert (await _post(client, 2)).status == 200
+        await handler.drain(1)
+        assert handled == [2]
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_updates_still_being_handled(webhook_client):
+    handled = []
+    client, handler = await webhook_client(_dispatcher(handled, delay=0.3))
+    try:
+        assert (await _post(client, 1)).status == 200  # answered before handling
+        assert handled == [] and handler.inflight == 1
+        assert await handler.drain(2) == 0
+        assert handled == [1]
+    finally:
+        await client.close()
+
+
+def test_replicas_without_scheduler_add_no_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "run_scheduler", False)
+
+    async def job(*args):
+        pass
+
+    scheduler_service.schedule_user_job(99, 3, job)
+    scheduler_service.schedule_target_job("nasa", 3, job)
+    assert scheduler_service.scheduler.get_job("user:99") is None
+    assert scheduler_service.scheduler.get_job("target:nasa:3") is None
+
+
+@pytest.mark.asyncio
+async def test_replicas_without_scheduler_are_ready(monkeypatch):
+    async def mongo_ok():
+        return True, "ok"
+
+    monkeypatch.setattr(healthcheck, "_mongo_ok", mongo_ok)
+    assert not scheduler_service.scheduler.running
+
+    monkeypatch.setattr(settings, "run_scheduler", False)
+    ready = await healthcheck._readyz(None)
+    assert ready.status == 200
+    assert json.loads(ready.text)["checks"]["scheduler"] == "disabled"
+
+    monkeypatch.setattr(settings, "run_scheduler", True)
+    assert (await healthcheck._readyz(None)).status == 503
+
+
+# ───────────────────────── throughput: polling vs webhook ─────────────────────────
+
+
+async def _until(handled, total):
+    while len(handled) < total:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_polling_vs_webhook_throughput(webhook_client):
+    handled = []
+    dp = _dispatcher(handled)
+    bot = Bot(token="123456:TEST", session=FakeTelegram(UPDATES, TELEGRAM_RTT))
+    started = time.perf_counter()
+    polling = asyncio.ensure_future(
+        dp.start_polling(bot, handle_signals=False, close_bot_session=False)
+    )
+    await asyncio.wait_for(_until(handled, UPDATES), timeout=60)
+    polling_rate = UPDATES / (time.perf_counter() - started)
+    await dp.stop_polling()
+    await polling
+
+    handled = []
+    client, handler = await webhook_client(_dispatcher(handled))
+    gate = asyncio.Semaphore(WEBHOOK_CONNECTIONS)
+
+    async def deliver(i):
+        async with gate:
+            await asyncio.sleep(TELEGRAM_RTT / 2)  # Telegram → bot leg
+            assert (await _post(client, i)).status == 200
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(deliver(i) for i in range(1, UPDATES + 1)))
+        await asyncio.wait_for(_until(handled, UPDATES), timeout=60)
+        webhook_rate = UPDATES / (time.perf_counter() - started)
+    finally:
+        await client.close()
+
+    print(
+        f"{UPDATES} updates, {HANDLER_SECONDS * 1000:.0f} ms handlers, "
+        f"{TELEGRAM_RTT * 1000:.0f} ms RTT: polling {polling_rate:.0f}/s, "
+        f"webhook {webhook_rate:.0f}/s per replica"
+    )
+    assert sorted(handled) == list(range(1, UPDATES + 1))